@@ -1,7 +1,20 @@
 # 🌍 GLOBAL TEMPERATURE STORY DASHBOARD 
+import functools
+
 import streamlit as st
-import pandas as pd
-import altair as alt
+
+import climate_profiling
+import climate_warmup
+
+# The data stack is imported on first use (or by the startup warm-up below), so pages
+# that never touch it, such as Home, do not wait for pandas and Altair
+pd = climate_warmup.deferred("pandas")
+np = climate_warmup.deferred("numpy")
+alt = climate_warmup.deferred("altair")
+climate_analytics = climate_warmup.deferred("climate_analytics")
+climate_charts = climate_warmup.deferred("climate_charts")
+climate_data = climate_warmup.deferred("climate_data")
+climatebot = climate_warmup.deferred("climatebot")
 
 # ─── Page Config ────────────────────────────────────
 st.set_page_config(
@@ -54,8 +67,11 @@ st.sidebar.caption("""
 🔑 Use keyboard ↑↓ or type to search options. 
 Use this menu to switch between sections of the dashboard:
 - **Home**: Overview of global temperature trends
-- **Explore Trends**: Yearly patterns, variability, and status comparisons
+- **Explore Trends**: Yearly patterns, variability, status comparisons, and warming rates
 - **Warming Gases**: Contributions by greenhouse gases and sources
+- **Monthly Temperatures**: Seasonal cycles and monthly anomalies
+- **Contribution Rankings**: Which countries contributed most to warming
+- **Food vs Temperature**: How food production growth tracks temperature change
 - **Placeholder**: This is a placeholder page.
 - **Chat Assistant**: Ask questions like "Which country warmed fastest in 1998?"
 
@@ -63,46 +79,105 @@ Use this menu to switch between sections of the dashboard:
 """)
 page = st.sidebar.radio(
     "Go to:",
-    ["Home", "Explore Trends", "Warming Gases", "Placeholder", "Chat Assistant"],  
+    ["Home", "Explore Trends", "Warming Gases", "Monthly Temperatures", "Contribution Rankings", "Food vs Temperature", "Placeholder", "Chat Assistant"],  
     index=0
 )
 
-# ─── Data Load and Prep ─────────────────
-@st.cache_data
-def load_data():
-    df = pd.read_csv("Indicator_3_1_Climate_Indicators_Annual_Mean_Global_Surface_Temperature_577579683071085080.csv")
-    year_cols = [c for c in df.columns if c.isdigit()]
-    df_long = df.melt(
-        id_vars=["Country", "ISO2", "ISO3", "Indicator", "Unit"],
-        value_vars=year_cols,
-        var_name="Year",
-        value_name="TempChange"
-    )
-    df_long["Year"] = df_long["Year"].astype(int)
-    df_long.sort_values(["Country", "Year"], inplace=True)
+# Per-rerun timings; enabled with CLIMATE_PROFILE=1 or ?profile=1
+profiler = climate_profiling.Profiler.from_request(st.query_params)
 
-    # Add DevStatus 
-    developed_iso3 = ["USA", "CAN", "GBR", "DEU", "FRA", "JPN", "AUS", "NZL", "NOR", "SWE", "CHE"]
-    df_long["DevStatus"] = df_long["ISO3"].apply(lambda x: "Developed" if x in developed_iso3 else "Developing")
-
-    return df_long
+# ─── Data Load and Prep ─────────────────
+@st.cache_resource
+def latest_builds():
+    # Last (version, object, inputs) built per dataset, so a new version that only appends
+    # years extends it instead of rebuilding; see climate_data.appended_since
+    return {}
+
+def refreshed(name, source, version, frame, build, extend, inputs=None):
+    # `inputs` versions anything else the build reads (e.g. the group tables); a change there always rebuilds
+    latest = latest_builds().get(name)
+    offset = climate_data.appended_since(source, latest[0]) if latest and latest[2] == inputs else None
+    result = extend(latest[1], frame.iloc[offset:]) if offset is not None else None
+    if result is None:
+        result = build(frame)
+    latest_builds()[name] = (version, result, inputs)
+    return result
+
+@st.cache_resource(max_entries=1)
+def load_cube(version, groups_version):
+    # Country×year arrays plus Explore Trends aggregates, shared read-only across sessions; the
+    # long frame they are built from is not kept, so no mutable copy of the dataset is shared.
+    # Keyed by the group tables too, so editing them (or CLIMATE_GROUPS_CSV) regroups without a restart
+    return refreshed("cube", climate_data.INDICATOR_CSV, version, climate_data.load_indicator_long(),
+                     climate_analytics.TrendCube, climate_analytics.TrendCube.extended, groups_version)
+
+@st.cache_resource(max_entries=1)
+def load_monthly_cube(version):
+    # Memory-mapped; pages only read the entity they display
+    return climate_data.load_monthly_cube()
+
+@st.cache_resource(max_entries=1)
+def load_contribution_ranking(version):
+    # Per-year orderings and prefix sums; queries never regroup the raw rows
+    return refreshed("contributions", climate_data.CONTRIBUTIONS_CSV, version, climate_data.load_contributions(),
+                     climate_analytics.ContributionRanking, climate_analytics.ContributionRanking.extended)
+
+@st.cache_resource(max_entries=1)
+def load_food_panel(version):
+    # Compact, dictionary-encoded parse of temp_change_df as entity×year matrices, rebuilt
+    # with the file like the country groups the cube takes from it
+    return climate_analytics.FoodTempPanel(climate_data.load_food_temp())
+
+@st.cache_resource(max_entries=1)
+def load_bot(version, groups_version):
+    # Rankings and summaries are built once; answering a question is index lookups only
+    return climatebot.ClimateBot(load_cube(version, groups_version))
+
+@st.cache_resource(max_entries=1)
+def load_gas_store(version):
+    # Shared read-only store; rows are sliced, never modified, by the gas page
+    return refreshed("gas", climate_data.GAS_CSV, version, climate_data.load_gas_wide(),
+                     climate_data.GasStore, climate_data.GasStore.extended)
+
+# ─── Startup Warm-up ─────────────────
+# The first run in a server process starts every loader on a background pool; a page
+# then only waits for whatever is left of its own dataset. See climate_warmup
+warmup = climate_warmup.start({
+    "indicator": lambda: load_bot(climate_data.dataset_version(), climate_data.groups_version()),
+    "gas": lambda: load_gas_store(climate_data.dataset_version(climate_data.GAS_CSV)),
+    "contributions": lambda: load_contribution_ranking(climate_data.dataset_version(climate_data.CONTRIBUTIONS_CSV)),
+    "food": lambda: load_food_panel(climate_data.dataset_version(climate_data.FOOD_TEMP_CSV)),
+    "monthly": lambda: load_monthly_cube(climate_data.dataset_version(climate_data.MONTHLY_CSV)),
+})
+if not warmup.ready():
+    st.sidebar.caption("⏳ Loading datasets in the background…")
+
+# Only the pages built on the indicator cube wait for it
+if page in ["Explore Trends", "Placeholder", "Chat Assistant"]:
+    with profiler.stage("load_data"):
+        data_version = climate_data.dataset_version(), climate_data.groups_version()
+        cube = load_cube(*data_version)
 
-df_long = load_data()
-    
 # ─── Sidebar Filters ───────────────
-if page not in ["Home", "Chat Assistant", "Warming Gases"]:
+if page not in ["Home", "Chat Assistant", "Warming Gases", "Monthly Temperatures", "Contribution Rankings", "Food vs Temperature"]:
     st.sidebar.header("🔍 Filters")
-    countries = ["All"] + sorted(df_long["Country"].unique())
-    years = sorted(df_long["Year"].unique())  # Keep years available if needed
+    countries = ["All"] + cube.countries
+    years = cube.years.tolist()
 
     selected_country = st.sidebar.selectbox("Country", countries)
-    selected_year = st.sidebar.selectbox("Year", years)  # Optional: keep if you want to filter by year
-
-    # Filter the DataFrame based on selected country and year
-    filtered = df_long.copy()
-    
-    if selected_country != "All":
-        filtered = filtered[filtered["Country"] == selected_country]
+    selected_year = st.sidebar.selectbox("Year", years, index=len(years) - 1)
+
+    # Both filters select by basic indexing into the shared read-only matrix (a row, a column
+    # or one cell, see TrendCube.view), so no session holds a copy of the dataset
+    entity = "World" if selected_country == "All" else selected_country
+    value = cube.view(entity, selected_year)
+    change = value - cube.view(entity, selected_year - 1) if selected_year > years[0] else np.nan
+    st.sidebar.metric(
+        f"{entity}, {selected_year}",
+        "n/a" if np.isnan(value) else f"{value:+.2f} °C",
+        None if np.isnan(change) else f"{change:+.2f} °C vs {selected_year - 1}",
+        delta_color="inverse"
+    )
 
 # ─── Home Page ───────────────────────────── 
 if page == "Home":
@@ -118,10 +193,27 @@ if page == "Home":
     
 # ─── Explore Trends Page Tabs ─────────────────────────────
 if page == "Explore Trends":
-    tab1, tab2, tab3, tab4 = st.tabs(["📈 Year-over-Year", "🌡️ Scatter Plot", "🔻 Variability", "🌍 Country Status"])
+    # Each tab is a fragment that only runs while its tab is open: opening a tab computes
+    # that tab alone, and a widget inside a tab reruns just that tab's fragment
+    def profiled_fragment(stage):
+        # A fragment-only rerun comes after the full run's profiler has finished, so it
+        # times itself with a fresh profiler and reports that rerun on its own
+        def decorate(render):
+            @functools.wraps(render)
+            def run(selected_country, selected_year):
+                rerun = profiler.finished
+                tab_profiler = climate_profiling.Profiler.from_request(st.query_params) if rerun else profiler
+                with tab_profiler.stage(stage):
+                    render(tab_profiler, selected_country, selected_year)
+                if rerun:
+                    tab_profiler.finish(page)
+                    tab_profiler.render_panel(st.container())
+            return st.fragment(run)
+        return decorate
 
     # ─── Tab 1: Year-over-Year Changes ─────────────────────
-    with tab1:
+    @profiled_fragment("tab: Year-over-Year")
+    def year_over_year_tab(tab_profiler, selected_country, selected_year):
         st.subheader("📈 Historical Year-over-Year Temperature Changes")
         
         st.write("""
@@ -132,161 +224,114 @@ if page == "Explore Trends":
         - **Analyze** the relationship between year-over-year changes (line) and overall temperature trends (scatter points) to identify patterns and anomalies.
         - Use **zoom and pan** features to focus on specific time periods for a more detailed examination.
         - To return to viewing all countries, simply **deselect** any highlighted points in the scatter plot.
+        - The **dashed line** marks the year selected in the sidebar.
 
         Enjoy exploring the temperature trends!
         """)
 
-        # Sample Countries Helper
-        def get_sample_countries(df, n=10, min_years=20):
-            country_counts = (
-                df.dropna(subset=["TempChange"])
-                .groupby("Country")["Year"]
-                .count()
-                .reset_index(name="count")
-            )
-            top_countries = country_counts[country_counts["count"] >= min_years].sort_values("count", ascending=False).head(n)
-            return top_countries["Country"].tolist()
-
-        if selected_country == "All":
-            sample_countries = get_sample_countries(df_long)
-            yoy_data = df_long[df_long["Country"].isin(sample_countries)].copy()
-            yoy_data["YoY_Change"] = yoy_data.groupby("Country")["TempChange"].diff()
-            scatter_data = df_long[df_long["Country"].isin(sample_countries)]
-
-            line = alt.Chart(yoy_data).mark_line(point=True).encode(
-                x=alt.X("Year:O"),
-                y=alt.Y("YoY_Change:Q", title="Change from Previous Year (°C)"),
-                color="Country:N",
-                tooltip=["Year", "Country", "YoY_Change"]
-            ).properties(title="Year-over-Year Change – Sample Countries", height=350, width=800)
-
-        else:
-            yoy_data = df_long[df_long["Country"] == selected_country].copy()
-            yoy_data["YoY_Change"] = yoy_data["TempChange"].diff()
-            scatter_data = df_long[df_long["Country"] == selected_country]
-
-            line = alt.Chart(yoy_data).mark_line(point=True).encode(
-                x=alt.X("Year:O"),
-                y=alt.Y("YoY_Change:Q", title="Change from Previous Year (°C)"),
-                color=alt.value("#f45b69"),
-                tooltip=["Year", "YoY_Change"]
-            ).properties(title=f"Year-over-Year Change – {selected_country}", height=350, width=800)
-
-        sel_country = alt.selection_point(fields=["Country"], empty="all")
-
-        scatter = alt.Chart(scatter_data).mark_circle(size=60).encode(
-            x=alt.X("Year:O", title="Year"),
-            y=alt.Y("TempChange:Q", title="Temperature Change (°C)"),
-            color=alt.Color("TempChange:Q", scale=alt.Scale(scheme="plasma")),
-            opacity=alt.condition(sel_country, alt.value(1), alt.value(0.15)),
-            tooltip=["Country", "Year", "TempChange"]
-        ).add_params(sel_country).properties(title="Raw Temperature Change", height=350, width=800)
-
-        st.altair_chart(line & scatter, use_container_width=True)
+        tab_profiler.altair_chart("yoy line & scatter", climate_charts.yoy_chart(cube, selected_country, selected_year), use_container_width=True)
 
     # ─── Tab 2: Temperature Scatter Plot ───────────────────
-    with tab2:
+    @profiled_fragment("tab: Scatter Plot")
+    def scatter_tab(tab_profiler, selected_country, selected_year):
         st.subheader("🌡️ Temperature Change Scatter Plot by Country")
 
         st.write("""
         This scatter plot shows the **actual annual temperature change** for each country over time.
         Use the interactive legend and selection tool to highlight a country and explore its data.
+        The dashed line marks the year selected in the sidebar.
         """)
 
-        sel_country_2 = alt.selection_point(fields=["Country"], empty="all")
-
-        if selected_country == "All":
-            scatter_data_2 = df_long[df_long["Country"].isin(df_long["Country"].unique()[:10])]
-        else:
-            scatter_data_2 = df_long[df_long["Country"] == selected_country]
-
-        scatter_chart = alt.Chart(scatter_data_2).mark_circle(size=60).encode(
-            x=alt.X("Year:O", title="Year"),
-            y=alt.Y("TempChange:Q", title="Temperature Change (°C)"),
-            color=alt.Color("Country:N" if selected_country == "All" else "TempChange:Q", 
-                            scale=alt.Scale(scheme="plasma")),
-            opacity=alt.condition(sel_country_2, alt.value(1), alt.value(0.15)),
-            tooltip=["Country", "Year", "TempChange"]
-        ).add_params(sel_country_2).properties(
-            width=800,
-            height=450,
-            title="Annual Temperature Change by Country"
-        )
-
-        st.altair_chart(scatter_chart, use_container_width=True)
+        tab_profiler.altair_chart("scatter by country", climate_charts.country_scatter_chart(cube, selected_country, selected_year), use_container_width=True)
 
     # ─── Tab 3: Variability Analysis ───────────────────────
-    with tab3:
+    @profiled_fragment("tab: Variability")
+    def variability_tab(tab_profiler, selected_country, selected_year):
         st.subheader("🔻 Countries with Decreasing Temperature Variability")
         st.info("""
         This chart compares the **standard deviation of temperature change** before and after 1993.
         A **negative delta** indicates more stable climate conditions.
         """)
 
-        early = df_long[df_long["Year"] <= 1992].groupby("Country")["TempChange"].std().reset_index(name="Std_Early")
-        late = df_long[df_long["Year"] >= 1993].groupby("Country")["TempChange"].std().reset_index(name="Std_Late")
-        std_comp = early.merge(late, on="Country")
-        std_comp["Delta_Std"] = std_comp["Std_Late"] - std_comp["Std_Early"]
-        decreasing = std_comp[std_comp["Delta_Std"] < 0].sort_values("Delta_Std")
-
-        bar = alt.Chart(decreasing).mark_bar().encode(
-            x=alt.X("Delta_Std:Q", title="∆ Std Dev (1993–2024 − 1961–1992)"),
-            y=alt.Y("Country:N", sort="-x"),
-            color=alt.Color("Delta_Std:Q", scale=alt.Scale(scheme="viridis", domainMid=0)),
-            tooltip=["Country", "Std_Early", "Std_Late", "Delta_Std"]
-        ).properties(
-            height=500,
-            width=750,
-            title="Top Countries with Decreasing Yearly Temperature Variability"
-        )
-
-        st.altair_chart(bar, use_container_width=True)
+        tab_profiler.altair_chart("variability bars", climate_charts.variability_chart(cube), use_container_width=True)
 
     # ─── Tab 4: Developed vs Developing Comparison ─────────
-    with tab4:
-        st.subheader("🌍 Developed vs Developing: Temperature Comparison")
-        
-        st.write("""
-        Developed countries, often referred to as "high-income" nations, typically have advanced technological infrastructure,
-        high standards of living, and robust economies. Examples include the United States, Germany, and Japan.
-
-        Developing countries face challenges like limited access to education, healthcare, and infrastructure.
-        Examples include India, Nigeria, and Bangladesh.
+    @profiled_fragment("tab: Country Status")
+    def country_status_tab(tab_profiler, selected_country, selected_year):
+        # Every grouping's means are slices of one precomputed group×year matrix
+        grouping = st.radio("Group countries by", list(cube.groupings), horizontal=True, key="status_grouping")
+
+        if grouping == climate_data.DEV_GROUPING:
+            st.subheader("🌍 Developed vs Developing: Temperature Comparison")
+            st.write("""
+            Developed countries, often referred to as "high-income" nations, typically have advanced technological infrastructure,
+            high standards of living, and robust economies. Examples include the United States, Germany, and Japan.
+
+            Developing countries face challenges like limited access to education, healthcare, and infrastructure.
+            Examples include Bangladesh, Ethiopia, and Nepal.
+
+            Here "developed" means OECD members and "developing" the least developed countries, as classified in the
+            food production data. Regional aggregates such as Africa are left out of both groups.
+            """)
+        elif grouping == climate_analytics.ENTITY_TYPE:
+            st.subheader("🌍 Countries vs Regional Aggregates: Temperature Comparison")
+            st.write("""
+            The mean temperature change of individual countries next to the mean of the aggregate rows in the data,
+            such as Africa or the World, which are reported as separate entities.
+            """)
+        else:
+            st.subheader(f"🌍 Temperature Comparison by {grouping}")
+            st.write(f"""
+            Mean temperature change of the countries in each {grouping} group, as classified in the table set by
+            `CLIMATE_GROUPS_CSV`. Countries the table does not list, and regional aggregates, are left out.
+            """)
+
+        line_chart, bar_chart = climate_charts.dev_status_charts(cube, grouping)
+        tab_profiler.altair_chart("devstatus line", line_chart, use_container_width=True)
+        tab_profiler.altair_chart("devstatus 5-year bars", bar_chart, use_container_width=True)
+
+    # ─── Tab 5: Warming Rate Ranking ───────────────────────
+    @profiled_fragment("tab: Warming Rate")
+    def warming_rate_tab(tab_profiler, selected_country, selected_year):
+        st.subheader("🚀 Which Countries Are Warming Fastest?")
+        st.info("""
+        Each bar is the **linear trend of temperature change** for a country, in °C per decade,
+        fitted over the selected period. The whiskers show the **95% confidence interval** of the trend.
         """)
 
-        dev_sel = alt.selection_multi(fields=["DevStatus"], bind="legend")
-        dev_avg = df_long.groupby(["Year", "DevStatus"])["TempChange"].mean().reset_index()
-
-        line_chart = alt.Chart(dev_avg).mark_line(point=True).encode(
-            x=alt.X("Year:O"),
-            y=alt.Y("TempChange:Q", title="Avg Temp Change (°C)"),
-            color=alt.Color("DevStatus:N", scale=alt.Scale(domain=["Developed", "Developing"], range=["#2ca02c", "#ff7f0e"])),
-            opacity=alt.condition(dev_sel, alt.value(1.0), alt.value(0.15)),
-            tooltip=["Year", "DevStatus", "TempChange"]
-        ).add_params(dev_sel).properties(
-            title="Average Temp Change by Economic Status",
-            width=750,
-            height=400
+        first_year, last_year = int(cube.years[0]), int(cube.years[-1])
+        trend_range = st.slider("Trend Period", first_year, last_year, (first_year, last_year), key="trend_range")
+        top_n = st.slider("Countries Shown", 5, 50, 20, key="trend_top_n")
+
+        tab_profiler.altair_chart(
+            "warming rate ranking",
+            climate_charts.warming_rate_chart(cube, trend_range, top_n, selected_country),
+            use_container_width=True
         )
 
-        st.altair_chart(line_chart, use_container_width=True)
-
-        df_long["YearGroup"] = (df_long["Year"] // 5) * 5
-        dev_bar = df_long.groupby(["YearGroup", "DevStatus"])["TempChange"].mean().reset_index()
-
-        bar_chart = alt.Chart(dev_bar).mark_bar().encode(
-            x=alt.X("YearGroup:O", title="5-Year Group"),
-            y=alt.Y("TempChange:Q", title="Avg Temp Change (°C)"),
-            color=alt.Color("DevStatus:N", scale=alt.Scale(domain=["Developed", "Developing"], range=["#2ca02c", "#ff7f0e"])),
-            opacity=alt.condition(dev_sel, alt.value(1.0), alt.value(0.25)),
-            tooltip=["YearGroup", "DevStatus", "TempChange"]
-        ).add_params(dev_sel).properties(
-            title="5-Year Avg Temp Change by Development Status",
-            width=750,
-            height=400
+        st.write(f"""
+        The yearly series of **{"the World" if selected_country == "All" else selected_country}** with its
+        **{climate_analytics.ROLLING_WINDOW}-year rolling mean**, which smooths out single warm or cold years,
+        and the fitted trend over the selected period.
+        """)
+        tab_profiler.altair_chart(
+            "warming rate smoothed series",
+            climate_charts.smoothed_trend_chart(cube, selected_country, trend_range),
+            use_container_width=True
         )
 
-        st.altair_chart(bar_chart, use_container_width=True)
+    trend_tabs = [
+        ("📈 Year-over-Year", year_over_year_tab),
+        ("🌡️ Scatter Plot", scatter_tab),
+        ("🔻 Variability", variability_tab),
+        ("🌍 Country Status", country_status_tab),
+        ("🚀 Warming Rate", warming_rate_tab),
+    ]
+    tabs = st.tabs([label for label, _ in trend_tabs], key="trends_tab", on_change="rerun")
+    for tab, (_, render_tab) in zip(tabs, trend_tabs):
+        if tab.open:
+            with tab:
+                render_tab(selected_country, selected_year)
 
 # ─── Warming Gases Page ─────────────────────────────────────
 if page == "Warming Gases":
@@ -296,80 +341,25 @@ if page == "Warming Gases":
     Click on a section of the chart to highlight or filter different contributors.
     """)
 
-    # Set a default year range and country
-    dev_year_range = (1961, 2004)  # You can add a sidebar slider later if needed
+    with profiler.stage("gas: load"):
+        gas_store = load_gas_store(climate_data.dataset_version(climate_data.GAS_CSV))
 
-    # Gas data
-    df2 = pd.read_csv("global-warming-by-gas-and-source.csv")
-    df2 = df2[
-        (df2["Year"] >= dev_year_range[0]) &
-        (df2["Year"] <= dev_year_range[1])
-    ].copy()
-
-    available_countries = df2["Entity"].unique()
+    available_countries = gas_store.entities
     chart_country = st.sidebar.selectbox(
         "Select Country",
-        ["All"] + sorted(available_countries),
+        ["All"] + available_countries,
         index=0
     )
-    # chart_country = selected_country if 'selected_country' in locals() else "All"
-
-    def gas_data(entity):
-        name = "World" if entity == "All" else entity
-        g = df2[df2["Entity"] == name].copy()
-        return g
-    
-    gas_cols = [c for c in df2.columns if c.startswith("Change in")]
-
-    shortened_columns = {
-        col: (
-            "N2O_FF&I" if "nitrous oxide" in col and "fossil fuels" in col else
-            "N2O_AgLU" if "nitrous oxide" in col else
-            "CH4_FF&I" if "methane" in col and "fossil fuels" in col else
-            "CH4_AgLU" if "methane" in col else
-            "CO2_FF&I" if "fossil fuels" in col else 
-            "CO2_AgLU"
-        )
-        for col in gas_cols
-    }
-
-    gas_df = gas_data(chart_country)
-    gas_df.drop(columns=["Code"], inplace=True)
-    gas_df.rename(columns=shortened_columns, inplace=True)
-
-    gas_long = gas_df.melt(
-        id_vars="Year",
-        value_vars=list(shortened_columns.values()),
-        var_name="series",
-        value_name="Temp Change"
+    dev_year_range = st.sidebar.slider(
+        "Year Range",
+        min_value=gas_store.year_min,
+        max_value=gas_store.year_max,
+        value=(max(1961, gas_store.year_min), min(2004, gas_store.year_max))
     )
 
-    label_map = {
-        "CO2_FF&I": "CO₂ (Fossil Fuels & Industry)",
-        "CO2_AgLU": "CO₂ (Agriculture & Land Use)",
-        "CH4_FF&I": "CH₄ (Fossil Fuels & Industry)",
-        "CH4_AgLU": "CH₄ (Agriculture & Land Use)",
-        "N2O_FF&I": "N₂O (Fossil Fuels & Industry)",
-        "N2O_AgLU": "N₂O (Agriculture & Land Use)"
-    }
-    gas_long["Legend"] = gas_long["series"].map(label_map)
-
-    # Interactive selection logic
-    selection = alt.selection_point(fields=['Legend'])
-    condition = alt.condition(selection, 'Legend:N', alt.ColorValue('lightgray'))
-
-    # Area chart showing contribution by gas
-    area = alt.Chart(gas_long).mark_area(opacity=0.7).encode(
-        x=alt.X("Year:O", title="Year"),
-        y=alt.Y("Temp Change:Q", title="Temperature Change (°C)"),
-        color=condition,
-        order="series:N",
-        tooltip=['Year:O', 'Legend:N', 'Temp Change:Q']
-    ).add_params(selection).properties(
-        width=900,
-        height=500,
-        title=f"Warming Contributions by Gas Type and Emission Source for {chart_country}" if chart_country != "All" else "Warming Contributions by Gas Type and Emission Source (Entire World)"
-    )
+    # Pre-partitioned by Entity and already in long format; no per-rerun melt
+    with profiler.stage("gas: slice"):
+        area = climate_charts.gas_area_chart(gas_store, chart_country, dev_year_range)
 
     # Explanation and chart rendering
     st.markdown("""
@@ -383,7 +373,203 @@ if page == "Warming Gases":
     - Solutions include transitioning to renewable energy, electrification of transportation, and adopting energy-efficient technologies.
     """)
 
-    st.altair_chart(area, use_container_width=True)
+    profiler.altair_chart("gas area", area, use_container_width=True)
+
+    st.markdown("""
+    #### Does a country's own temperature track the warming its emissions cause?
+    The solid line is the country's surface temperature change from the climate indicator data; the dashed
+    line is the global warming caused by its greenhouse gas emissions, on its own axis.
+    """)
+    # The two files name countries differently; they are joined on the shared country id
+    with profiler.stage("gas: temperature join"):
+        joined = climate_analytics.temp_vs_gas_frame(load_cube(climate_data.dataset_version(), climate_data.groups_version()), gas_store,
+                                                     "World" if chart_country == "All" else chart_country,
+                                                     dev_year_range)
+    if joined is None:
+        st.caption(f"No surface temperature series is available for {chart_country}.")
+    else:
+        profiler.altair_chart("temp vs gas", climate_charts.temp_vs_gas_chart(joined, chart_country),
+                              use_container_width=True)
+
+# ─── Monthly Temperatures Page ──────────────────────────────
+if page == "Monthly Temperatures":
+    st.subheader("🗓️ Monthly Temperatures and the Seasonal Cycle")
+    st.info("""
+    These charts use **average monthly surface temperatures** to show how each month compares with a
+    baseline climatology, and whether the gap between the warmest and coldest month is changing.
+    """)
+
+    with profiler.stage("monthly: load"):
+        monthly = load_monthly_cube(climate_data.dataset_version(climate_data.MONTHLY_CSV))
+
+    entity = st.sidebar.selectbox(
+        "Select Country or Region",
+        monthly.entities,
+        index=monthly.entities.index("World") if "World" in monthly.entities else 0
+    )
+    baselines = {"1951–1980": (1951, 1980), "1961–1990": (1961, 1990), "1991–2020": (1991, 2020)}
+    baseline_label = st.sidebar.selectbox("Baseline Period", list(baselines))
+    baseline = baselines[baseline_label]
+    first_year, last_year = int(monthly.years[0]), int(monthly.years[-1])
+    month_range = st.sidebar.slider("Year Range", first_year, last_year, (first_year, last_year))
+
+    # Only this entity's slice is read from the memory-mapped cube
+    with profiler.stage("monthly: compute"):
+        block, block_years = monthly.entity_block(entity)
+        climatology = climate_analytics.monthly_climatology(block, block_years, baseline)
+        anomaly = climate_analytics.monthly_anomaly(block, block_years, baseline)
+        amplitude, _ = climate_analytics.seasonal_cycle(block)
+    in_range = (block_years >= month_range[0]) & (block_years <= month_range[1])
+
+    compare_year = st.selectbox("Compare a Year Against the Baseline", block_years[in_range][::-1].tolist())
+    compare_row = int(np.searchsorted(block_years, compare_year))
+    cycle = pd.DataFrame({
+        "Month": climate_data.MONTHS * 2,
+        "MonthNum": list(range(1, 13)) * 2,
+        "Temperature": np.r_[climatology, block[compare_row]],
+        "Series": [f"Baseline {baseline_label}"] * 12 + [str(compare_year)] * 12,
+    })
+    cycle_chart = alt.Chart(cycle).mark_line(point=True).encode(
+        x=alt.X("Month:N", sort=climate_data.MONTHS, title="Month"),
+        y=alt.Y("Temperature:Q", title="Average Temperature (°C)", scale=alt.Scale(zero=False)),
+        color=alt.Color("Series:N", scale=alt.Scale(range=["#888888", "#f45b69"])),
+        tooltip=["Series", "Month", alt.Tooltip("Temperature:Q", format=".2f")]
+    ).properties(title=f"Seasonal Cycle – {entity}", height=350, width=800)
+    profiler.altair_chart("monthly cycle", cycle_chart, use_container_width=True)
+
+    heat = pd.DataFrame({
+        "Year": np.repeat(block_years[in_range], 12),
+        "Month": climate_data.MONTHS * int(in_range.sum()),
+        "Anomaly": anomaly[in_range].ravel(),
+    }).dropna(subset=["Anomaly"])
+    heat_chart = alt.Chart(heat).mark_rect().encode(
+        x=alt.X("Year:O", title="Year"),
+        y=alt.Y("Month:N", sort=climate_data.MONTHS, title=None),
+        color=alt.Color("Anomaly:Q", title="Anomaly (°C)", scale=alt.Scale(scheme="redblue", reverse=True, domainMid=0)),
+        tooltip=["Year", "Month", alt.Tooltip("Anomaly:Q", format="+.2f")]
+    ).properties(title=f"Monthly Anomaly vs {baseline_label} – {entity}", height=300, width=800)
+    profiler.altair_chart("monthly anomaly heatmap", heat_chart, use_container_width=True)
+
+    seasons = pd.DataFrame({"Year": block_years[in_range], "Amplitude": amplitude[in_range]}).dropna()
+    amplitude_chart = alt.Chart(seasons).mark_line(point=True, color="#ff7f0e").encode(
+        x=alt.X("Year:O", title="Year"),
+        y=alt.Y("Amplitude:Q", title="Warmest − Coldest Month (°C)", scale=alt.Scale(zero=False)),
+        tooltip=["Year", alt.Tooltip("Amplitude:Q", format=".2f")]
+    ).properties(title=f"Seasonal Amplitude – {entity}", height=300, width=800)
+    profiler.altair_chart("seasonal amplitude", amplitude_chart, use_container_width=True)
+
+# ─── Contribution Rankings Page ─────────────────────────────
+if page == "Contribution Rankings":
+    st.subheader("🏆 Who Contributed Most to Global Warming?")
+    st.info("""
+    Each country's **share of contribution to global warming** from its historical emissions.
+    Rankings for any period are answered from a precomputed index, so moving the sliders is instant.
+    """)
+
+    with profiler.stage("contributions: load"):
+        ranking_index = load_contribution_ranking(climate_data.dataset_version(climate_data.CONTRIBUTIONS_CSV))
+    first_year, last_year = int(ranking_index.years[0]), int(ranking_index.years[-1])
+
+    rank_range = st.sidebar.slider("Year Range", first_year, last_year, (1950, min(2000, last_year)))
+    top_k = st.sidebar.slider("Top Contributors", 3, 25, 10)
+
+    top = ranking_index.top_k(rank_range[0], rank_range[1], k=top_k)
+    top_chart = alt.Chart(top).mark_bar().encode(
+        x=alt.X("Share:Q", title="Average Share of Warming (%)"),
+        y=alt.Y("Entity:N", sort="-x", title=None),
+        color=alt.Color("Share:Q", scale=alt.Scale(scheme="orangered"), legend=None),
+        tooltip=["Rank", "Entity", alt.Tooltip("Share:Q", format=".2f"), alt.Tooltip("Cumulative Share:Q", format=".1f")]
+    ).properties(
+        title=f"Top {top_k} Contributors, {rank_range[0]}–{rank_range[1]}",
+        height=max(250, 24 * len(top)),
+        width=750
+    )
+    profiler.altair_chart("top contributors", top_chart, use_container_width=True)
+    if len(top):
+        st.caption(f"Together these {len(top)} countries account for **{top['Cumulative Share'].iloc[-1]:.1f}%** of warming in this period.")
+
+    st.markdown("#### Ranking Over Time")
+    step = st.select_slider("Step (years)", options=[1, 5, 10, 25], value=5)
+    # Every stepped year is shipped once; the slider below filters client-side
+    steps = ranking_index.yearly_top_k(k=top_k, step=step)
+    stepped_years = sorted(steps["Year"].unique())
+    rank_year = alt.param(
+        name="rank_year",
+        value=int(stepped_years[-1]),
+        bind=alt.binding_range(min=int(stepped_years[0]), max=int(stepped_years[-1]), step=step, name="Year ")
+    )
+    stepped_chart = alt.Chart(steps).mark_bar().encode(
+        x=alt.X("Share:Q", title="Share of Warming (%)"),
+        y=alt.Y("Entity:N", sort="-x", title=None),
+        color=alt.Color("Entity:N", legend=None),
+        tooltip=["Year", "Rank", "Entity", alt.Tooltip("Share:Q", format=".2f"), alt.Tooltip("Cumulative Share:Q", format=".1f")]
+    ).add_params(rank_year).transform_filter(
+        alt.datum.Year == rank_year
+    ).properties(title="Top Contributors by Year", height=max(250, 24 * top_k), width=750)
+    profiler.altair_chart("stepped ranking", stepped_chart, use_container_width=True)
+
+# ─── Food vs Temperature Page ───────────────────────────────
+if page == "Food vs Temperature":
+    st.subheader("🌾 Food Production Growth vs Temperature Change")
+    st.info("""
+    Does food production grow more slowly in years that are warmer than usual? These charts compare the
+    **annual growth rate of food production value** with **temperature change**, using a rolling correlation
+    so you can see how the relationship shifts over time.
+    """)
+
+    with profiler.stage("food: load"):
+        food_panel = load_food_panel(climate_data.dataset_version(climate_data.FOOD_TEMP_CSV))
+
+    food_entity = st.sidebar.selectbox(
+        "Select Country",
+        food_panel.entities,
+        index=food_panel.entities.index("United States") if "United States" in food_panel.entities else 0
+    )
+    window = st.sidebar.slider("Rolling Window (years)", 5, 30, 10)
+
+    with profiler.stage("food: compute"):
+        # One vectorized pass over every country; no per-country loop
+        latest = food_panel.latest_corr_frame(window)
+        food_series = food_panel.entity_frame(food_entity, window)
+
+    rolling_line = alt.Chart(food_series.dropna(subset=["Rolling Correlation"])).mark_line(point=True, color="#f45b69").encode(
+        x=alt.X("Year:O", title="Window End Year"),
+        y=alt.Y("Rolling Correlation:Q", title="Correlation", scale=alt.Scale(domain=[-1, 1])),
+        tooltip=["Year", alt.Tooltip("Rolling Correlation:Q", format=".2f")]
+    )
+    zero_rule = alt.Chart(pd.DataFrame({"y": [0]})).mark_rule(color="gray", strokeDash=[4, 4]).encode(y="y:Q")
+    profiler.altair_chart(
+        "food rolling correlation",
+        (rolling_line + zero_rule).properties(
+            title=f"{window}-Year Rolling Correlation – {food_entity}", height=320, width=800
+        ),
+        use_container_width=True
+    )
+
+    points = alt.Chart(food_series.dropna(subset=["Growth Rate", "TempChange"])).mark_circle(size=60).encode(
+        x=alt.X("TempChange:Q", title="Temperature Change (°C)"),
+        y=alt.Y("Growth Rate:Q", title="Food Production Growth (%)"),
+        color=alt.Color("Year:Q", scale=alt.Scale(scheme="plasma")),
+        tooltip=["Year", alt.Tooltip("TempChange:Q", format=".2f"), alt.Tooltip("Growth Rate:Q", format=".2f")]
+    )
+    trend = points.transform_regression("TempChange", "Growth Rate").mark_line(color="white")
+    profiler.altair_chart(
+        "food growth scatter",
+        (points + trend).properties(title=f"Growth vs Temperature Change – {food_entity}", height=350, width=800),
+        use_container_width=True
+    )
+
+    corr_bars = alt.Chart(climate_charts.fit_rows(latest)).mark_bar().encode(
+        x=alt.X("Correlation:Q", title=f"Latest {window}-Year Correlation", scale=alt.Scale(domain=[-1, 1])),
+        y=alt.Y("Entity:N", sort="x", title=None),
+        color=alt.condition(
+            alt.datum.Entity == food_entity,
+            alt.value("#f45b69"),
+            alt.Color("Correlation:Q", scale=alt.Scale(scheme="redblue", domain=[-1, 1]), legend=None)
+        ),
+        tooltip=["Entity", "Window End", alt.Tooltip("Correlation:Q", format=".2f"), alt.Tooltip("Full Period:Q", format=".2f")]
+    ).properties(title="Growth/Temperature Correlation by Country", height=max(300, 12 * len(latest)), width=800)
+    profiler.altair_chart("food correlation ranking", corr_bars, use_container_width=True)
 
 # ─── Roydan to add Content ───────────────────────────────────
 if page == "Placeholder":
@@ -420,24 +606,8 @@ if page == "Chat Assistant":
         st.chat_message("user").markdown(prompt)
         st.session_state.chat_history.append({"role": "user", "content": prompt})
 
-        # Hard-coded Q&A for demonstration
-        response = ""
-        q = prompt.lower()
-
-        if "highest temp" in q and "country" in q:
-            response = "The country with the highest recorded temperature change in 1998 was likely a high-latitude nation like Russia or Canada, but exact values depend on the dataset."
-        elif "variability" in q:
-            response = (
-                "Variability refers to how much temperatures fluctuate year to year. "
-                "Less variability means more climate stability, which can affect ecosystems and planning."
-            )
-        elif "developed" in q and "developing" in q:
-            response = (
-                "Developed countries often show earlier increases due to industrialization. "
-                "Developing countries are now experiencing steeper rises due to economic growth and emissions."
-            )
-        else:
-            response = "Great question! Try asking about a specific year, country, or trend type. I'm still learning! 🤖"
+        with profiler.stage("chat: answer"):
+            response = load_bot(*data_version).answer(prompt)
 
         st.chat_message("assistant").markdown(response)
         st.session_state.chat_history.append({"role": "assistant", "content": response})
@@ -453,4 +623,8 @@ st.write(
     </div>
     """,
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+# ─── Profiling Panel ───────────────────────────────────────
+profiler.finish(page)
+profiler.render_panel(st.sidebar)
@@ -0,0 +1,245 @@
+# ⏱️ DASHBOARD BENCHMARKS
+# Drives "Project Dashboard.py" headlessly with Streamlit's AppTest and records, for
+# every page and a matrix of sidebar selections: cold and warm rerun time, peak
+# Python memory, the byte size of every emitted chart and, with --stages, the
+# per-tab/per-chart breakdown from climate_profiling.
+#
+#   python benchmarks/bench_dashboard.py                       # run, write bench_results.json
+#   python benchmarks/bench_dashboard.py --baseline old.json   # also fail on regressions
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+APP_PATH = REPO_DIR / "Project Dashboard.py"
+sys.path.insert(0, str(REPO_DIR))
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import climate_data  # noqa: E402
+import climate_profiling  # noqa: E402
+import climate_warmup  # noqa: E402
+
+# (page, sidebar widget label, values); None means the page has no sidebar selection
+SELECTION_MATRIX = [
+    ("Home", None, [None]),
+    ("Explore Trends", "Country", ["All", "France", "United States"]),
+    ("Warming Gases", "Select Country", ["All", "France", "China"]),
+    ("Monthly Temperatures", "Select Country or Region", ["World", "France"]),
+    ("Contribution Rankings", None, [None]),
+    ("Food vs Temperature", "Select Country", ["United States", "India"]),
+    ("Placeholder", "Country", ["All"]),
+]
+
+# Explore Trends only renders its open tab, so every other tab is benchmarked explicitly
+TREND_TABS = ["🌡️ Scatter Plot", "🔻 Variability", "🌍 Country Status", "🚀 Warming Rate"]
+
+CHAT_PROMPTS = [
+    "Which country had the highest temp change in 1998?",
+    "Which country warmed fastest?",
+    "Compare France and Germany in 2010",
+    "What does decreased variability mean?",
+]
+
+
+# ─── Measurement Helpers ────────────────────────────
+def reset_caches(scratch_dir):
+    """Forget everything a fresh server process would not have: Streamlit caches and on-disk snapshots."""
+    # The startup warm-up would otherwise refill the caches during the measured run
+    warmup = climate_warmup.current()
+    if warmup is not None:
+        warmup.wait()
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    climate_data.CACHE_DIR = Path(tempfile.mkdtemp(dir=scratch_dir))
+
+
+def chart_sizes(at):
+    """Serialized size of each Vega-Lite chart, grouped by the tab it was rendered in."""
+    sizes = []
+
+    def walk(node, tab):
+        if getattr(node, "type", None) == "tab":
+            tab = node.label
+        if getattr(node, "type", None) == "vega_lite_chart":
+            proto = node.proto
+            data_bytes = len(proto.data.data) + sum(len(d.data.data) for d in proto.datasets)
+            sizes.append({"tab": tab, "spec_bytes": len(proto.spec), "data_bytes": data_bytes,
+                          "total_bytes": len(proto.spec) + data_bytes})
+        for child in getattr(node, "children", {}).values():
+            walk(child, tab)
+
+    walk(at.main, None)
+    return sizes
+
+
+def timed_run(at, timeout):
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    return time.perf_counter() - start
+
+
+def open_page(page, label, value, timeout):
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    at.run()
+    at.sidebar.radio[0].set_value(page).run()
+    if label is not None:
+        widget = next(w for w in at.sidebar.selectbox if w.label == label)
+        widget.set_value(value)
+    return at
+
+
+def prepare_run(at, prompt=None, tab=None):
+    """Re-apply the inputs AppTest does not keep between runs: the chat prompt and the open Explore Trends tab."""
+    if prompt is not None:
+        at.chat_input[0].set_value(prompt)
+    if tab is not None:
+        at.session_state["trends_tab"] = tab
+
+
+def check_errors(at, case):
+    if at.exception:
+        raise RuntimeError(f"{case}: {[e.value for e in at.exception]}")
+
+
+# ─── Cases ──────────────────────────────────────────
+def bench_case(page, label, value, repeats, timeout, measure_memory, scratch_dir, prompt=None, tab=None):
+    case = {"page": page, "selection": value if prompt is None else prompt}
+    if tab is not None:
+        case["selection"] = f"{value} / {tab}"
+    cold, warm = [], []
+    for _ in range(repeats):
+        at = open_page(page, label, value, timeout)
+        prepare_run(at, prompt, tab)
+        reset_caches(scratch_dir)
+        cold.append(timed_run(at, timeout))
+        check_errors(at, case)
+        prepare_run(at, prompt, tab)
+        warm.append(timed_run(at, timeout))
+        check_errors(at, case)
+
+    if climate_profiling.PROFILE_ENV:
+        # Per-stage breakdown (each Explore Trends tab, chart emission, ...) of the last warm rerun
+        case["stages"] = [dict(s) for s in climate_profiling.LAST_RUN]
+
+    case["cold_s"] = statistics.median(cold)
+    case["warm_s"] = statistics.median(warm)
+    case["charts"] = chart_sizes(at)
+    case["chart_bytes"] = sum(c["total_bytes"] for c in case["charts"])
+
+    if measure_memory:
+        # Separate pass: tracemalloc slows the interpreter and would skew the timings above
+        at = open_page(page, label, value, timeout)
+        prepare_run(at, prompt, tab)
+        reset_caches(scratch_dir)
+        tracemalloc.start()
+        at.run(timeout=timeout)
+        case["peak_mem_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return case
+
+
+def run_benchmarks(repeats=3, timeout=120, measure_memory=True, pages=None):
+    cases = [(page, label, value, None, None) for page, label, values in SELECTION_MATRIX for value in values]
+    cases += [("Explore Trends", "Country", "All", None, tab) for tab in TREND_TABS]
+    cases += [("Chat Assistant", None, None, prompt, None) for prompt in CHAT_PROMPTS]
+
+    results = []
+    original_cache_dir = climate_data.CACHE_DIR
+    scratch_dir = tempfile.mkdtemp(prefix="bench-cache-")
+    try:
+        for page, label, value, prompt, tab in cases:
+            if pages and page not in pages:
+                continue
+            results.append(bench_case(page, label, value, repeats, timeout, measure_memory, scratch_dir, prompt, tab))
+            print(_summary_line(results[-1]), flush=True)
+    finally:
+        climate_data.CACHE_DIR = original_cache_dir
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    return results
+
+
+def _summary_line(case):
+    mem = f"{case['peak_mem_bytes'] / 1e6:7.1f} MB" if "peak_mem_bytes" in case else "      n/a"
+    return (f"{case['page']:<22} {str(case['selection'])[:36]:<36} cold {case['cold_s'] * 1000:8.1f} ms  "
+            f"warm {case['warm_s'] * 1000:8.1f} ms  charts {case['chart_bytes'] / 1024:8.1f} KiB  peak {mem}")
+
+
+# ─── Baseline Comparison ────────────────────────────
+def compare(results, baseline, tolerance, min_delta_s):
+    """Regressions of `results` against `baseline`: timings and chart bytes beyond the relative tolerance."""
+    previous = {(c["page"], str(c["selection"])): c for c in baseline["results"]}
+    regressions = []
+    for case in results:
+        old = previous.get((case["page"], str(case["selection"])))
+        if old is None:
+            continue
+        for metric in ("cold_s", "warm_s", "chart_bytes", "peak_mem_bytes"):
+            if metric not in case or metric not in old or not old[metric]:
+                continue
+            ratio = case[metric] / old[metric]
+            # Ignore scheduler jitter on very fast reruns
+            if metric.endswith("_s") and case[metric] - old[metric] < min_delta_s:
+                continue
+            if ratio > 1 + tolerance:
+                regressions.append({"page": case["page"], "selection": case["selection"], "metric": metric,
+                                    "baseline": old[metric], "current": case[metric], "ratio": ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless performance benchmarks for the dashboard.")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown/growth (default 0.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore timing regressions smaller than this")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per case; the median is reported")
+    parser.add_argument("--timeout", type=float, default=120, help="per-run timeout in seconds")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("--page", action="append", dest="pages", help="only benchmark this page (repeatable)")
+    parser.add_argument("--stages", action="store_true",
+                        help="also record per-stage timings via the profiling hooks (adds spec-size overhead)")
+    args = parser.parse_args(argv)
+
+    if args.stages:
+        climate_profiling.PROFILE_ENV = True
+
+    results = run_benchmarks(args.repeats, args.timeout, not args.no_memory, args.pages)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "streamlit": st.__version__,
+            "repeats": args.repeats,
+            # Background warm-up of the first server run, per task (imports, each dataset, total)
+            "warmup_s": dict(climate_warmup.current().timings) if climate_warmup.current() else {},
+        },
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms / 1000)
+        report["regressions"] = regressions
+        for r in regressions:
+            print(f"REGRESSION {r['page']} [{r['selection']}] {r['metric']}: "
+                  f"{r['baseline']:.4g} -> {r['current']:.4g} (x{r['ratio']:.2f})")
+        exit_code = 1 if regressions else 0
+
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"Wrote {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# 🧪 APPENDED-YEAR CHECKS
+# Simulates a source gaining a year and checks that the incremental snapshot
+# update (climate_data.cached_frame's extend hooks) both runs and produces what
+# a full rebuild would: the same frame, and the same TrendCube / GasStore /
+# ContributionRanking whether built from scratch or via .extended().
+#
+#   python benchmarks/check_appends.py        # exits 1 on any mismatch
+import csv
+import io
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_DIR))
+
+import climate_analytics  # noqa: E402
+import climate_data  # noqa: E402
+
+
+# ─── Source Edits ───────────────────────────────────
+def drop_last_column(data):
+    """The Indicator CSV as it was one year earlier."""
+    return b"\n".join(line.rsplit(b",", 1)[0] for line in data.splitlines()) + b"\n"
+
+
+def add_year_column(data, year):
+    """The Indicator CSV with one more year column; the last row's new cell is left blank."""
+    lines = data.splitlines()
+    body = [line + b"," + (f"{0.01 * i:.3f}".encode() if i < len(lines) - 1 else b"") for i, line in enumerate(lines[1:], 1)]
+    return b"\n".join([lines[0] + f",{year}".encode()] + body) + b"\n"
+
+
+def drop_last_year_rows(data):
+    """A long Entity/Code/Year CSV without the rows of its last year."""
+    lines = data.splitlines()
+    years = [int(next(csv.reader([line.decode()]))[2]) for line in lines[1:]]
+    last = max(years)
+    return b"\n".join([lines[0]] + [line for line, y in zip(lines[1:], years) if y != last]) + b"\n"
+
+
+# ─── Checks ─────────────────────────────────────────
+def sorted_frame(frame, keys):
+    return frame.sort_values(keys, kind="stable").reset_index(drop=True)
+
+
+def appended_offset(snapshot, version):
+    # climate_data.appended_since only knows the real source paths, so read the stamp's lineage directly
+    meta = json.loads((climate_data.CACHE_DIR / f"{snapshot}.json").read_text())
+    return dict(map(tuple, meta.get("lineage", []))).get(version)
+
+
+def check_append(name, snapshot, path, old, new, load, build, keys, derived):
+    """Load `old`, then `new`; returns a list of failures."""
+    failures = []
+    path.write_bytes(old)
+    before = load(path)
+    version = json.loads((climate_data.CACHE_DIR / f"{snapshot}.json").read_text())["sha256"]
+    path.write_bytes(new)
+    after = load(path)
+
+    offset = appended_offset(snapshot, version)
+    if offset is None:
+        failures.append(f"{name}: the append was not taken incrementally")
+    full = build(io.BytesIO(new))
+    if not sorted_frame(after, keys).equals(sorted_frame(full, keys)):
+        failures.append(f"{name}: incremental frame differs from a full rebuild")
+    if offset is not None:
+        for label, (built, extended) in derived(before, after, offset).items():
+            if extended is None:
+                failures.append(f"{name}: {label}.extended() refused the append")
+            elif not built(extended):
+                failures.append(f"{name}: {label}.extended() differs from a full build")
+    return failures
+
+
+def arrays_close(a, b):
+    return np.allclose(a, b, equal_nan=True, atol=1e-12)
+
+
+def cube_checks(before, after, offset):
+    full = climate_analytics.TrendCube(after)
+    extended = climate_analytics.TrendCube(before).extended(after.iloc[offset:])
+    fields = ["temp", "yoy", "smoothed", "std_late", "group_yearly_mean", "group_5yr_mean"]
+    return {"TrendCube": (lambda cube: all(arrays_close(getattr(cube, f), getattr(full, f)) for f in fields), extended)}
+
+
+def gas_checks(before, after, offset):
+    full = climate_data.GasStore(after)
+    extended = climate_data.GasStore(before).extended(after.iloc[offset:])
+
+    def same(store):
+        return store.entities == full.entities and all(
+            store.entity_frame(e).equals(full.entity_frame(e)) for e in full.entities)
+    return {"GasStore": (same, extended)}
+
+
+def contribution_checks(before, after, offset):
+    full = climate_analytics.ContributionRanking(after)
+    extended = climate_analytics.ContributionRanking(before).extended(after.iloc[offset:])
+    return {"ContributionRanking": (lambda r: arrays_close(r.share, full.share) and arrays_close(r.prefix, full.prefix),
+                                    extended)}
+
+
+def main():
+    scratch = Path(tempfile.mkdtemp(prefix="append-check-"))
+    original_cache_dir = climate_data.CACHE_DIR
+    failures = []
+    try:
+        indicator = climate_data.INDICATOR_CSV.read_bytes()
+        cases = [
+            ("indicator (last year)", "indicator_long", "indicator.csv", drop_last_column(indicator), indicator,
+             climate_data.load_indicator_long, climate_data.build_indicator_long, ["Country", "Year"], cube_checks),
+            ("indicator (blank last cell)", "indicator_long", "indicator.csv", indicator, add_year_column(indicator, 2099),
+             climate_data.load_indicator_long, climate_data.build_indicator_long, ["Country", "Year"], cube_checks),
+        ]
+        for name, snapshot, source, load, build, checks in [
+            ("gas", "gas_wide", climate_data.GAS_CSV, climate_data.load_gas_wide, climate_data.build_gas_wide,
+             gas_checks),
+            ("contributions", "contributions", climate_data.CONTRIBUTIONS_CSV, climate_data.load_contributions,
+             climate_data.build_contributions, contribution_checks),
+        ]:
+            data = source.read_bytes()
+            cases.append((name, snapshot, f"{name}.csv", drop_last_year_rows(data), data, load, build,
+                          ["Entity", "Year"], checks))
+
+        for name, snapshot, file_name, old, new, load, build, keys, derived in cases:
+            climate_data.CACHE_DIR = Path(tempfile.mkdtemp(dir=scratch))
+            case_failures = check_append(name, snapshot, scratch / file_name, old, new, load, build, keys, derived)
+            print(f"{name:<28} {'FAIL' if case_failures else 'ok'}")
+            failures += case_failures
+    finally:
+        climate_data.CACHE_DIR = original_cache_dir
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
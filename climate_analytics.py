@@ -0,0 +1,637 @@
+# 🌍 GLOBAL TEMPERATURE ANALYTICS
+# Derived metrics built once per dataset version and shared read-only by the dashboard.
+import copy
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from climate_data import DEV_GROUPING, FOOD_VALUE, intern_countries, load_country_groups
+
+# Split point for the Variability tab (≤1992 vs ≥1993)
+VARIABILITY_SPLIT_YEAR = 1993
+
+# Years in the trailing mean drawn over each country's series in the Warming Rate tab
+ROLLING_WINDOW = 10
+
+# Built-in grouping that every cube has, next to the configured ones (climate_data.GROUP_TABLES)
+ENTITY_TYPE = "Entity Type"
+
+
+def _readonly(arr):
+    arr.setflags(write=False)
+    return arr
+
+
+def _nanstd(values, axis):
+    # Sample std (ddof=1) skipping NaN, like pandas; NaN where fewer than 2 values
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        std = np.nanstd(values, axis=axis, ddof=1)
+    std[np.sum(~np.isnan(values), axis=axis) < 2] = np.nan
+    return std
+
+
+def _safe_mean(sums, counts):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+# ─── Warming Rates ──────────────────────────────────
+def _t_critical(df, confidence=0.95):
+    # Cornish-Fisher expansion of the Student t quantile around the normal one;
+    # within ~0.01 of the exact value from 3 degrees of freedom up
+    z = {0.90: 1.6448536, 0.95: 1.9599640, 0.99: 2.5758293}[confidence]
+    df = np.asarray(df, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (
+            z
+            + (z ** 3 + z) / (4 * df)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3)
+        )
+
+
+def _trend_moments(temp, years, origin):
+    """Per-row sums (n, Σx, Σy, Σx², Σxy, Σy²) over the non-NaN cells, with x = year − origin.
+
+    Sums over disjoint year ranges add, so appending years only needs the
+    moments of the new columns.
+    """
+    mask = ~np.isnan(temp)
+    x = np.where(mask, np.asarray(years, dtype=float) - origin, 0.0)
+    y = np.where(mask, temp, 0.0)
+    return np.stack([mask.sum(axis=1), x.sum(axis=1), y.sum(axis=1),
+                     (x * x).sum(axis=1), (x * y).sum(axis=1), (y * y).sum(axis=1)]).astype(float)
+
+
+class WarmingRates:
+    """Per-country linear trends of temperature change, fitted for all countries at once.
+
+    Every row of the country×year matrix is an independent least-squares fit
+    y = intercept + slope·year over its non-NaN years, solved in closed form
+    from per-row sums, so there is no Python loop over countries. Rows with
+    fewer than `min_years` observations get NaN.
+    """
+
+    def __init__(self, temp, years, min_years=10, confidence=0.95, moments=None):
+        years = np.asarray(years, dtype=np.int64)
+        # Years are centred on a fixed origin to keep the sums well conditioned
+        self._origin = float(years[0]) if len(years) else 0.0
+        moments = _trend_moments(temp, years, self._origin) if moments is None else moments
+        n, sx, sy, sxx, sxy, syy = moments
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_mean = sx / n
+            y_mean = sy / n
+            sxx_c = sxx - sx * x_mean
+            sxy_c = sxy - sx * y_mean
+            syy_c = syy - sy * y_mean
+            slope = sxy_c / sxx_c
+            intercept = y_mean - slope * (x_mean + self._origin)
+            ssr = np.maximum(syy_c - slope * sxy_c, 0.0)
+            stderr = np.sqrt(ssr / (n - 2) / sxx_c)
+            r2 = 1.0 - ssr / syy_c
+            half_width = _t_critical(n - 2, confidence) * stderr
+
+        too_short = (n < max(min_years, 3)) | ~(sxx_c > 1e-9)
+        for arr in (slope, intercept, stderr, r2, half_width):
+            arr[too_short] = np.nan
+
+        self._moments = _readonly(moments)
+        self.min_years = min_years
+        self.years = _readonly(years)
+        self.n_years = _readonly(n.astype(np.int64))
+        self.slope = _readonly(slope)
+        self.intercept = _readonly(intercept)
+        self.stderr = _readonly(stderr)
+        self.r2 = _readonly(r2)
+        self.ci_low = _readonly(slope - half_width)
+        self.ci_high = _readonly(slope + half_width)
+        self.confidence = confidence
+
+    def extended(self, temp, years):
+        """Fits over these years plus the later `years` columns in `temp`, from the added sums only."""
+        moments = self._moments + _trend_moments(temp, years, self._origin)
+        return WarmingRates(None, np.concatenate([self.years, years]), self.min_years, self.confidence, moments)
+
+
+def rolling_mean(temp, window=10, min_periods=None):
+    """Trailing `window`-year mean along the year axis, skipping NaN; NaN until `min_periods` values are seen."""
+    min_periods = window if min_periods is None else min_periods
+    mask = ~np.isnan(temp)
+    sums = np.cumsum(np.where(mask, temp, 0.0), axis=1)
+    counts = np.cumsum(mask, axis=1)
+    sums[:, window:] = sums[:, window:] - sums[:, :-window]
+    counts[:, window:] = counts[:, window:] - counts[:, :-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts >= min_periods, sums / counts, np.nan)
+
+
+def _window_sum(values, window):
+    # Trailing `window`-column sums along axis 1 via a cumulative sum
+    sums = np.cumsum(values, axis=1)
+    sums[:, window:] = sums[:, window:] - sums[:, :-window]
+    return sums
+
+
+def rolling_corr(x, y, window=10, min_periods=None):
+    """Trailing-window Pearson correlation of two row-aligned matrices, every row at once.
+
+    Only years where both series are present count towards a window; windows
+    with fewer than `min_periods` such pairs, or no variance, are NaN.
+    """
+    min_periods = window if min_periods is None else min_periods
+    pair = ~np.isnan(x) & ~np.isnan(y)
+    xs = np.where(pair, x, 0.0)
+    ys = np.where(pair, y, 0.0)
+    n = _window_sum(pair.astype(float), window)
+    sx, sy = _window_sum(xs, window), _window_sum(ys, window)
+    sxx, syy, sxy = _window_sum(xs * xs, window), _window_sum(ys * ys, window), _window_sum(xs * ys, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+    return np.where((n >= min_periods) & (var_x > 1e-12) & (var_y > 1e-12), np.clip(r, -1, 1), np.nan)
+
+
+def row_corr(x, y, min_periods=3):
+    """Full-length Pearson correlation per row, over years where both series are present."""
+    return rolling_corr(x, y, window=x.shape[1], min_periods=min_periods)[:, -1]
+
+
+# ─── Food Production vs Temperature ─────────────────
+class FoodTempPanel:
+    """Entity×year matrices of food production, its growth rate and temperature change."""
+
+    def __init__(self, food_temp, value_col=FOOD_VALUE):
+        entities = sorted(food_temp["Entity"].astype(str).unique())
+        years = np.sort(food_temp["Year"].unique()).astype(np.int64)
+        rows = pd.Categorical(food_temp["Entity"].astype(str), categories=entities).codes
+        cols = np.searchsorted(years, food_temp["Year"].to_numpy())
+
+        def matrix(col):
+            m = np.full((len(entities), len(years)), np.nan)
+            m[rows, cols] = food_temp[col].to_numpy(dtype=float)
+            return _readonly(m)
+
+        codes = food_temp.drop_duplicates("Entity").assign(Entity=lambda d: d["Entity"].astype(str))
+        codes = codes.set_index("Entity")["Code"].astype(object).reindex(entities)
+
+        self.entities = entities
+        self.entity_index = {e: i for i, e in enumerate(entities)}
+        self.entity_ids, self.by_id = intern_countries(codes.to_numpy())
+        self.years = _readonly(years)
+        self.food = matrix(value_col)
+        self.growth = matrix("Growth Rate")
+        self.temp = matrix("TempChange")
+        self.corr = _readonly(row_corr(self.growth, self.temp))
+
+    def rolling(self, window):
+        """Rolling growth/temperature correlation for every entity (entity×year)."""
+        return rolling_corr(self.growth, self.temp, window)
+
+    def latest_corr_frame(self, window):
+        """Each entity's most recent complete-window correlation next to its full-period one."""
+        rolling = self.rolling(window)
+        valid = ~np.isnan(rolling)
+        last = np.where(valid.any(axis=1), valid.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1), -1)
+        latest = np.where(last >= 0, rolling[np.arange(len(rolling)), last], np.nan)
+        return pd.DataFrame({
+            "Entity": self.entities,
+            "Correlation": latest,
+            "Window End": np.where(last >= 0, self.years[last], 0),
+            "Full Period": self.corr,
+        }).dropna(subset=["Correlation"]).sort_values("Correlation", kind="stable")
+
+    def entity_frame(self, entity, window):
+        i = self.entity_index[entity]
+        return pd.DataFrame({
+            "Year": self.years,
+            "Growth Rate": self.growth[i] * 100,
+            "TempChange": self.temp[i],
+            "Rolling Correlation": rolling_corr(self.growth[i:i + 1], self.temp[i:i + 1], window)[0],
+        })
+
+
+# ─── Monthly Climatology ────────────────────────────
+# These work on any (..., year, month) block, so a single entity or a stack
+# of entities sliced from the monthly cube go through the same code.
+def monthly_climatology(block, years, base=(1951, 1980)):
+    """Mean temperature of each calendar month over the inclusive `base` period."""
+    years = np.asarray(years)
+    in_base = (years >= base[0]) & (years <= base[1])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmean(block[..., in_base, :], axis=-2)
+
+
+def monthly_anomaly(block, years, base=(1951, 1980)):
+    """Departure of every month from its `base`-period climatology."""
+    return block - monthly_climatology(block, years, base)[..., None, :]
+
+
+def seasonal_cycle(block):
+    """Per-year seasonal amplitude (warmest − coldest month) and warmest month (1–12)."""
+    complete = ~np.isnan(block).any(axis=-1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        amplitude = np.nanmax(block, axis=-1) - np.nanmin(block, axis=-1)
+    warmest = np.argmax(np.where(np.isnan(block), -np.inf, block), axis=-1) + 1
+    # Partial years (e.g. the running year) would understate the cycle
+    return np.where(complete, amplitude, np.nan), np.where(complete, warmest, 0)
+
+
+# ─── Contribution Rankings ──────────────────────────
+class ContributionRanking:
+    """Per-year and year-range rankings of each country's share of global warming.
+
+    Only rows with a country code are ranked; regions, income groups and the
+    World total would otherwise crowd out the countries. Year-range queries
+    use prefix sums over the entity×year matrix, so they cost O(entities)
+    regardless of how many years the range spans.
+    """
+
+    def __init__(self, contributions):
+        wide = self._pivot(contributions)
+        share = wide.to_numpy(dtype=float)
+        observed = ~np.isnan(share)
+        self.entities = [str(e) for e in wide.index]
+        codes = contributions.drop_duplicates("Entity").set_index("Entity")["Code"].astype(object)
+        self.entity_ids, self.by_id = intern_countries(codes.reindex(wide.index).to_numpy())
+        self.years = _readonly(wide.columns.to_numpy().astype(np.int64))
+        self.share = _readonly(share)
+
+        # Prefix sums with a leading zero column: sum over [lo, hi) is prefix[:, hi] - prefix[:, lo]
+        self.prefix = _readonly(np.concatenate(
+            [np.zeros((len(share), 1)), np.cumsum(np.where(observed, share, 0.0), axis=1)], axis=1
+        ))
+        self.prefix_count = _readonly(np.concatenate(
+            [np.zeros((len(share), 1), dtype=np.int64), np.cumsum(observed, axis=1)], axis=1
+        ))
+
+        # Per-year order (best first, NaN last) and cumulative share of the top k
+        order, cumulative = self._rank_years(share)
+        self.year_order = _readonly(order)
+        self.cumulative_share = _readonly(cumulative)
+
+    @staticmethod
+    def _pivot(contributions):
+        code = contributions["Code"].astype(str)
+        countries_only = contributions[contributions["Code"].notna() & (code != "OWID_WRL")]
+        return countries_only.pivot_table(index="Entity", columns="Year", values="Share", observed=True, sort=True)
+
+    @staticmethod
+    def _rank_years(share):
+        observed = ~np.isnan(share)
+        order = np.argsort(np.where(observed, -share, np.inf), axis=0, kind="stable")
+        cumulative = np.cumsum(np.take_along_axis(np.where(observed, share, 0.0), order, axis=0), axis=0)
+        return order, cumulative
+
+    def extended(self, rows):
+        """A new ranking with the later years in `rows` appended; only those year columns are ranked and summed.
+
+        Returns None when `rows` adds an entity or a year that is not after
+        the last one, in which case the ranking has to be rebuilt.
+        """
+        wide = self._pivot(rows)
+        if wide.empty:
+            return self
+        if not set(map(str, wide.index)) <= set(self.entities) or wide.columns[0] <= self.years[-1]:
+            return None
+        share = wide.reindex(self.entities).to_numpy(dtype=float)
+        observed = ~np.isnan(share)
+        order, cumulative = self._rank_years(share)
+
+        ranking = copy.copy(self)
+        ranking.years = _readonly(np.concatenate([self.years, wide.columns.to_numpy().astype(np.int64)]))
+        ranking.share = _readonly(np.concatenate([self.share, share], axis=1))
+        ranking.prefix = _readonly(np.concatenate(
+            [self.prefix, self.prefix[:, -1:] + np.cumsum(np.where(observed, share, 0.0), axis=1)], axis=1
+        ))
+        ranking.prefix_count = _readonly(np.concatenate(
+            [self.prefix_count, self.prefix_count[:, -1:] + np.cumsum(observed, axis=1)], axis=1
+        ))
+        ranking.year_order = _readonly(np.concatenate([self.year_order, order], axis=1))
+        ranking.cumulative_share = _readonly(np.concatenate([self.cumulative_share, cumulative], axis=1))
+        return ranking
+
+    def _year_slice(self, start, end):
+        lo = int(np.searchsorted(self.years, start, side="left"))
+        hi = int(np.searchsorted(self.years, end, side="right"))
+        return lo, hi
+
+    def range_mean(self, start, end):
+        """Mean share per entity over the inclusive year range, from the prefix sums."""
+        lo, hi = self._year_slice(start, end)
+        counts = self.prefix_count[:, hi] - self.prefix_count[:, lo]
+        return _safe_mean(self.prefix[:, hi] - self.prefix[:, lo], counts)
+
+    def top_k(self, start, end=None, k=10):
+        """Top-k entities by mean share over [start, end] (a single year when `end` is None)."""
+        end = start if end is None else end
+        mean = self.range_mean(start, end)
+        valid = np.flatnonzero(~np.isnan(mean))
+        k = min(k, len(valid))
+        if k == 0:
+            return pd.DataFrame({"Rank": [], "Entity": [], "Share": [], "Cumulative Share": []})
+        # argpartition keeps this linear in the number of entities
+        picked = valid[np.argpartition(-mean[valid], k - 1)[:k]]
+        picked = picked[np.argsort(-mean[picked], kind="stable")]
+        shares = mean[picked]
+        return pd.DataFrame({
+            "Rank": np.arange(1, k + 1),
+            "Entity": [self.entities[i] for i in picked],
+            "Share": shares,
+            "Cumulative Share": np.cumsum(shares),
+        })
+
+    def yearly_top_k(self, k=10, step=1):
+        """Long (Year, Rank, Entity, Share, Cumulative Share) rows for every `step`-th year, read from the per-year index."""
+        # Stepped back from the last year, so the latest ranking is always one of them
+        cols = np.arange(len(self.years) - 1, -1, -step)[::-1]
+        order = self.year_order[:k, cols]
+        shares = np.take_along_axis(self.share[:, cols], order, axis=0)
+        return pd.DataFrame({
+            "Year": np.tile(self.years[cols], k),
+            "Rank": np.repeat(np.arange(1, k + 1), len(cols)),
+            "Entity": np.asarray(self.entities, dtype=object)[order.ravel()],
+            "Share": shares.ravel(),
+            "Cumulative Share": self.cumulative_share[:k, cols].ravel(),
+        }).dropna(subset=["Share"])
+
+
+# ─── Trend Cube ─────────────────────────────────────
+class TrendCube:
+    """Dense country×year view of `df_long` with every Explore Trends aggregate precomputed.
+
+    All arrays are read-only; the frame helpers only slice them, so their cost
+    does not depend on the size of the dataset. `groups` is the ISO3-indexed
+    classification table (default climate_data.load_country_groups()).
+    """
+
+    def __init__(self, df_long, groups=None):
+        countries = sorted(pd.unique(df_long["Country"].astype(str)))
+        years = np.sort(pd.unique(df_long["Year"])).astype(np.int64)
+        country_idx = pd.Categorical(df_long["Country"].astype(str), categories=countries).codes
+        year_idx = np.searchsorted(years, df_long["Year"].to_numpy())
+
+        temp = np.full((len(countries), len(years)), np.nan)
+        temp[country_idx, year_idx] = df_long["TempChange"].to_numpy(dtype=float)
+
+        yoy = np.full_like(temp, np.nan)
+        yoy[:, 1:] = temp[:, 1:] - temp[:, :-1]
+
+        observed = ~np.isnan(temp)
+        filled = np.where(observed, temp, 0.0)
+
+        # Variability before/after the split year
+        early = years < VARIABILITY_SPLIT_YEAR
+        std_early = _nanstd(temp[:, early], axis=1)
+        std_late = _nanstd(temp[:, ~early], axis=1)
+
+        # Per-country ISO3, aligned with `countries`
+        iso3 = (
+            df_long.drop_duplicates("Country")
+            .assign(Country=lambda d: d["Country"].astype(str))
+            .set_index("Country")["ISO3"]
+            .astype(str)
+            .reindex(countries)
+            .to_numpy()
+        )
+        # Regional rows (AFRTMP, ASIATMP, ...) and the World total are not countries
+        is_aggregate = np.char.endswith(iso3.astype(str), "TMP") | (iso3 == "WLD")
+
+        # Every grouping's groups stacked into one one-hot group×country matrix, so a
+        # single product yields the group×year sums and counts of all groupings
+        group_codes = self._group_codes(iso3, is_aggregate, load_country_groups() if groups is None else groups)
+        self.groupings = {}
+        self._group_rows = {}
+        rows, cols = [], []
+        for name, (labels, codes) in group_codes.items():
+            start = sum(len(g) for g in self.groupings.values())
+            assigned = np.flatnonzero(codes >= 0)
+            rows.append(start + codes[assigned])
+            cols.append(assigned)
+            self.groupings[name] = labels
+            self._group_rows[name] = slice(start, start + len(labels))
+        membership = np.zeros((sum(len(g) for g in self.groupings.values()), len(countries)))
+        membership[np.concatenate(rows), np.concatenate(cols)] = 1.0
+
+        group_sums = membership @ filled
+        group_counts = membership @ observed
+
+        self.countries = countries
+        self.country_index = {c: i for i, c in enumerate(countries)}
+        self.iso3 = _readonly(iso3)
+        self.country_ids, self.by_id = intern_countries(iso3)
+        self.is_aggregate = _readonly(is_aggregate)
+        self.years = _readonly(years)
+        self.temp = _readonly(temp)
+        self.yoy = _readonly(yoy)
+        self.smoothed = _readonly(rolling_mean(temp, ROLLING_WINDOW, ROLLING_WINDOW // 2))
+        self.obs_count = _readonly(observed.sum(axis=1))
+        self.std_early = _readonly(std_early)
+        self.std_late = _readonly(std_late)
+        self.group_codes = {name: _readonly(codes) for name, (_, codes) in group_codes.items()}
+        self._membership = _readonly(membership)
+        self._group_sums = _readonly(group_sums)
+        self._group_counts = _readonly(group_counts)
+        self.group_yearly_mean = _readonly(_safe_mean(group_sums, group_counts))
+        self._set_year_groups()
+        self.rates = WarmingRates(self.temp, self.years)
+
+    @staticmethod
+    def _group_codes(iso3, is_aggregate, groups):
+        """{grouping: (group labels, group code per country or -1)} from the ISO3-indexed `groups` table."""
+        # A categorical join on ISO3 leaves unlisted countries unassigned; aggregates are
+        # unassigned too even when a table lists their code (e.g. WLD), so they never
+        # count twice in a group mean
+        joined = groups.reindex(iso3)
+        codes = {name: (list(joined[name].cat.categories),
+                        np.where(is_aggregate, -1, joined[name].cat.codes.to_numpy(np.intp)))
+                 for name in joined.columns}
+        codes[ENTITY_TYPE] = (["Country", "Aggregate"], is_aggregate.astype(np.intp))
+        return codes
+
+    def _set_year_groups(self):
+        # 5-year buckets are contiguous because years are sorted; they are summed
+        # from the group×year totals, so no country row is read
+        year_groups = (self.years // 5) * 5
+        bucket_starts = np.flatnonzero(np.r_[True, year_groups[1:] != year_groups[:-1]])
+        bucket_sums = np.add.reduceat(self._group_sums, bucket_starts, axis=1)
+        bucket_counts = np.add.reduceat(self._group_counts, bucket_starts, axis=1)
+        self.year_groups = _readonly(year_groups[bucket_starts])
+        self.group_5yr_mean = _readonly(_safe_mean(bucket_sums, bucket_counts))
+
+    # ─── Appended years ─────────────────────────────
+    def extended(self, rows):
+        """A new cube with the later years in `rows` (long Country/Year/TempChange) appended.
+
+        Only the new year columns are aggregated: YoY, group means and trend
+        sums are computed for them and joined to the existing results, and
+        this cube is left untouched for sessions still using it. Returns None
+        when `rows` holds an unknown country or a year that is not after the
+        last one, in which case the cube has to be rebuilt.
+        """
+        if len(rows) == 0:
+            return self
+        years = np.sort(pd.unique(rows["Year"])).astype(np.int64)
+        country_idx = pd.Categorical(rows["Country"].astype(str), categories=self.countries).codes
+        if years[0] <= self.years[-1] or (country_idx < 0).any():
+            return None
+
+        block = np.full((len(self.countries), len(years)), np.nan)
+        block[country_idx, np.searchsorted(years, rows["Year"].to_numpy())] = rows["TempChange"].to_numpy(dtype=float)
+        observed = ~np.isnan(block)
+
+        cube = copy.copy(self)
+        cube.years = _readonly(np.concatenate([self.years, years]))
+        cube.temp = _readonly(np.concatenate([self.temp, block], axis=1))
+        cube.yoy = _readonly(np.concatenate([self.yoy, np.diff(cube.temp[:, len(self.years) - 1:], axis=1)], axis=1))
+        cube.obs_count = _readonly(self.obs_count + observed.sum(axis=1))
+        # A new year's window reaches back ROLLING_WINDOW - 1 columns at most
+        lead = min(len(self.years), ROLLING_WINDOW - 1)
+        smoothed = rolling_mean(cube.temp[:, len(self.years) - lead:], ROLLING_WINDOW, ROLLING_WINDOW // 2)
+        cube.smoothed = _readonly(np.concatenate([self.smoothed, smoothed[:, lead:]], axis=1))
+        # New years fall after the split, so only the late-period spread changes
+        late = cube.years >= VARIABILITY_SPLIT_YEAR
+        cube.std_late = _readonly(_nanstd(cube.temp[:, late], axis=1))
+
+        group_sums = self._membership @ np.where(observed, block, 0.0)
+        group_counts = self._membership @ observed
+        cube._group_sums = _readonly(np.concatenate([self._group_sums, group_sums], axis=1))
+        cube._group_counts = _readonly(np.concatenate([self._group_counts, group_counts], axis=1))
+        cube.group_yearly_mean = _readonly(np.concatenate([self.group_yearly_mean, _safe_mean(group_sums, group_counts)], axis=1))
+        cube._set_year_groups()
+        cube.rates = self.rates.extended(block, years)
+        return cube
+
+    # ─── Zero-copy selection ────────────────────────
+    def view(self, country=None, year=None):
+        """Read-only view of `temp` for one country (row), one year (column), both, or neither.
+
+        Basic indexing only, so the result shares memory with the cube and no
+        per-session copy of the dataset is ever made.
+        """
+        rows = slice(None) if country in (None, "All") else self.country_index[country]
+        cols = slice(None) if year is None else int(np.searchsorted(self.years, year))
+        if year is not None and (cols >= len(self.years) or self.years[cols] != year):
+            raise KeyError(year)
+        return self.temp[rows, cols]
+
+    def warming_rates(self, start=None, end=None):
+        """Trend fits over an inclusive year range; the full range is precomputed."""
+        lo = 0 if start is None else int(np.searchsorted(self.years, start, side="left"))
+        hi = len(self.years) if end is None else int(np.searchsorted(self.years, end, side="right"))
+        if lo == 0 and hi == len(self.years):
+            return self.rates
+        return WarmingRates(self.temp[:, lo:hi], self.years[lo:hi])
+
+    # ─── Frame helpers for the charts ───────────────
+    def sample_countries(self, n=10, min_years=20):
+        """Countries with the most observed years (at least `min_years`), best first."""
+        eligible = np.flatnonzero(self.obs_count >= min_years)
+        order = eligible[np.argsort(-self.obs_count[eligible], kind="stable")][:n]
+        return [self.countries[i] for i in order]
+
+    def country_frame(self, countries):
+        """Long rows (Country, Year, TempChange, YoY_Change) for `countries`, ordered by country then year.
+
+        A single country's columns are views of the cube's rows; several
+        countries are joined into one long copy, which the layout needs.
+        """
+        rows = [self.country_index[c] for c in countries]
+        temp = [self.view(c) for c in countries]
+        yoy = [self.yoy[i] for i in rows]
+        return pd.DataFrame({
+            "Country": np.repeat([self.countries[i] for i in rows], len(self.years)),
+            "Year": np.tile(self.years, len(rows)),
+            "TempChange": temp[0] if len(rows) == 1 else np.concatenate(temp),
+            "YoY_Change": yoy[0] if len(rows) == 1 else np.concatenate(yoy),
+        }, copy=False)
+
+    def smoothed_frame(self, country, start=None, end=None):
+        """One country's yearly TempChange, its ROLLING_WINDOW-year mean and its linear trend over start–end."""
+        row = self.country_index[country]
+        lo = 0 if start is None else int(np.searchsorted(self.years, start, side="left"))
+        hi = len(self.years) if end is None else int(np.searchsorted(self.years, end, side="right"))
+        fit = WarmingRates(self.temp[row:row + 1, lo:hi], self.years[lo:hi])
+        trend = np.full(len(self.years), np.nan)
+        trend[lo:hi] = fit.intercept[0] + fit.slope[0] * self.years[lo:hi]
+        return pd.DataFrame({
+            "Year": self.years,
+            "Annual": self.temp[row],
+            f"{ROLLING_WINDOW}-year Mean": self.smoothed[row],
+            "Linear Trend": trend,
+        })
+
+    def variability_frame(self):
+        """Per-country early/late std and their delta (late − early)."""
+        return pd.DataFrame({
+            "Country": self.countries,
+            "Std_Early": self.std_early,
+            "Std_Late": self.std_late,
+            "Delta_Std": self.std_late - self.std_early,
+        })
+
+    def decreasing_variability(self):
+        std_comp = self.variability_frame()
+        return std_comp[std_comp["Delta_Std"] < 0].sort_values("Delta_Std")
+
+    def warming_rate_frame(self, rates=None, countries_only=True):
+        """Per-country trend in °C per decade with its confidence interval, fastest first."""
+        rates = self.rates if rates is None else rates
+        frame = pd.DataFrame({
+            "Country": self.countries,
+            "Rate": rates.slope * 10,
+            "CI_Low": rates.ci_low * 10,
+            "CI_High": rates.ci_high * 10,
+            "R2": rates.r2,
+            "Years": rates.n_years,
+        })
+        if countries_only:
+            frame = frame[~self.is_aggregate]
+        return frame.dropna(subset=["Rate"]).sort_values("Rate", ascending=False, kind="stable")
+
+    def grouped_yearly_mean(self, grouping=DEV_GROUPING):
+        """(group labels, group×year mean temperature change) of one grouping, a slice of the shared matrix."""
+        return self.groupings[grouping], self.group_yearly_mean[self._group_rows[grouping]]
+
+    def grouped_yearly_frame(self, grouping=DEV_GROUPING):
+        labels, means = self.grouped_yearly_mean(grouping)
+        return pd.DataFrame({
+            "Year": np.repeat(self.years, len(labels)),
+            "Group": np.tile(labels, len(self.years)),
+            "TempChange": means.T.ravel(),
+        })
+
+    def grouped_5yr_frame(self, grouping=DEV_GROUPING):
+        labels = self.groupings[grouping]
+        return pd.DataFrame({
+            "YearGroup": np.repeat(self.year_groups, len(labels)),
+            "Group": np.tile(labels, len(self.year_groups)),
+            "TempChange": self.group_5yr_mean[self._group_rows[grouping]].T.ravel(),
+        })
+
+# ─── Cross-dataset Joins ────────────────────────────
+def temp_vs_gas_frame(cube, gas_store, entity, year_range=None):
+    """Yearly temperature change of `entity` next to the global warming its emissions caused.
+
+    The indicator cube and the gas store name countries differently, so they
+    are joined on registry id; None when the cube has no row for `entity`.
+    """
+    row = cube.by_id.position(gas_store.entity_id(entity))
+    if row < 0:
+        return None
+    gas_years, warming = gas_store.warming_by_year(entity)
+    years, cube_cols, gas_cols = np.intersect1d(cube.years, gas_years, return_indices=True)
+    if year_range is not None:
+        keep = (years >= year_range[0]) & (years <= year_range[1])
+        years, cube_cols, gas_cols = years[keep], cube_cols[keep], gas_cols[keep]
+    return pd.DataFrame({
+        "Year": years,
+        "Temperature Change": cube.temp[row, cube_cols],
+        "Gas-driven Warming": warming[gas_cols],
+    })
@@ -0,0 +1,333 @@
+# 🌍 GLOBAL TEMPERATURE CHART HELPERS
+# Server-side downsampling so each Altair chart stays within a point/byte budget,
+# and the chart builders shared by the dashboard and the static export.
+import os
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from climate_data import DEV_GROUPING
+
+# "budget" reduces oversized chart data on the server; "full" sends every row
+RENDER_MODE = os.environ.get("CHART_RENDER_MODE", "budget")
+MAX_POINTS = int(os.environ.get("CHART_MAX_POINTS", 5000))
+MAX_BYTES = int(os.environ.get("CHART_MAX_BYTES", 1_000_000))
+
+
+# ─── Budgets ────────────────────────────────────────
+def row_budget(df, max_points=None, max_bytes=None):
+    """Largest row count for `df` that respects both the point and the byte budget, or None in full mode."""
+    if RENDER_MODE == "full":
+        return None
+    max_points = MAX_POINTS if max_points is None else max_points
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    if len(df) == 0:
+        return max_points
+    # Rough per-row payload: serialized values plus column names, as in the inlined records
+    bytes_per_row = df.memory_usage(deep=True, index=False).sum() / len(df) + sum(len(str(c)) for c in df.columns)
+    return max(1, min(max_points, int(max_bytes // max(bytes_per_row, 1))))
+
+
+# ─── Line Charts: LTTB ──────────────────────────────
+def lttb_indices(x, y, n_out):
+    """Indices of the Largest-Triangle-Three-Buckets subsample of (x, y), always keeping both endpoints."""
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 1)])
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # n_out - 2 buckets over the interior points; edges run from 1 to n - 1
+    edges = (np.floor(np.arange(n_out - 1) * (n - 2) / (n_out - 2)) + 1).astype(int)
+
+    picked = np.empty(n_out, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def fit_line(df, x, y, group=None, max_points=None, max_bytes=None):
+    """Downsample each `group` series of a line chart with LTTB, sharing the row budget evenly.
+
+    Returns `df` itself when it already fits, so callers can keep passing the
+    same frame to several charts and have it embedded once.
+    """
+    budget = row_budget(df, max_points, max_bytes)
+    if budget is None or len(df) <= budget:
+        return df
+
+    groups = [df] if group is None else [g for _, g in df.groupby(group, sort=False, observed=True)]
+    per_group = max(3, budget // max(len(groups), 1))
+    parts = []
+    for g in groups:
+        g = g.dropna(subset=[y]).sort_values(x, kind="stable")
+        parts.append(g.iloc[lttb_indices(g[x].to_numpy(), g[y].to_numpy(), per_group)])
+    return pd.concat(parts, ignore_index=True)
+
+
+# ─── Scatter Charts: Binning ────────────────────────
+def fit_scatter(df, x, y, max_points=None, max_bytes=None):
+    """Thin a scatter to one representative row per (x, y-bin) cell so it fits the row budget."""
+    budget = row_budget(df, max_points, max_bytes)
+    if budget is None or len(df) <= budget:
+        return df
+
+    df = df.dropna(subset=[y])
+    x_codes, _ = pd.factorize(df[x], sort=True)
+    n_x = x_codes.max() + 1 if len(x_codes) else 1
+    y_bins = max(1, budget // n_x)
+    values = df[y].to_numpy(dtype=float)
+    span = np.ptp(values) if len(values) else 0.0
+    y_codes = np.zeros(len(values), dtype=int) if span == 0 else np.minimum(
+        ((values - values.min()) / span * y_bins).astype(int), y_bins - 1
+    )
+    cells = pd.Series(x_codes.astype(np.int64) * y_bins + y_codes, index=df.index)
+    thinned = df[~cells.duplicated()]
+    if len(thinned) > budget:
+        # More distinct x values than the budget allows: fall back to an even stride
+        thinned = thinned.iloc[np.linspace(0, len(thinned) - 1, budget).astype(int)]
+    return thinned
+
+
+# ─── Area/Bar Charts: Bucketing ─────────────────────
+def fit_buckets(df, x, value, keys=(), max_points=None, max_bytes=None):
+    """Average `value` over runs of consecutive `x` values (e.g. years) so the chart fits the budget.
+
+    Each bucket is labelled by its first x value; `keys` are the series columns kept apart.
+    """
+    budget = row_budget(df, max_points, max_bytes)
+    if budget is None or len(df) <= budget:
+        return df
+
+    keys = list(keys)
+    n_series = max(len(df.drop_duplicates(keys)), 1) if keys else 1
+    positions, uniques = pd.factorize(df[x], sort=True)
+    width = int(np.ceil(len(uniques) * n_series / budget))
+    bucketed = df.assign(**{x: np.asarray(uniques)[positions // width * width]})
+    return (
+        bucketed.groupby([x] + keys, sort=True, observed=True)[value]
+        .mean()
+        .reset_index()
+    )
+
+
+def fit_rows(df, max_points=None, max_bytes=None):
+    """Keep the leading rows of an already-ranked frame (e.g. sorted bars) within the budget."""
+    budget = row_budget(df, max_points, max_bytes)
+    if budget is None or len(df) <= budget:
+        return df
+    return df.head(budget)
+
+
+# ─── Chart Builders ─────────────────────────────────
+# Pure functions of the shared data objects, so the live pages and
+# climate_export.py produce identical specs.
+DEV_COLORS = alt.Scale(domain=["Developed", "Developing"], range=["#2ca02c", "#ff7f0e"])
+
+
+def year_rule(year):
+    """Vertical marker at `year` on a Year:O axis; an empty layer when `year` is None."""
+    return alt.Chart(pd.DataFrame({"Year": [] if year is None else [year]})).mark_rule(
+        color="gray", strokeDash=[4, 4]
+    ).encode(x="Year:O")
+
+
+def yoy_chart(cube, country="All", year=None):
+    """Year-over-year line above the raw temperature scatter, for one country or a sample of countries; `year` is marked."""
+    if country == "All":
+        # One budgeted frame feeds both the line and the scatter, so it is embedded once
+        yoy_data = fit_line(cube.country_frame(cube.sample_countries()), "Year", "YoY_Change", group="Country")
+        line = alt.Chart(yoy_data).mark_line(point=True).encode(
+            x=alt.X("Year:O"),
+            y=alt.Y("YoY_Change:Q", title="Change from Previous Year (°C)"),
+            color="Country:N",
+            tooltip=["Year", "Country", "YoY_Change"]
+        ).properties(title="Year-over-Year Change – Sample Countries", height=350, width=800)
+    else:
+        yoy_data = fit_line(cube.country_frame([country]), "Year", "YoY_Change")
+        line = alt.Chart(yoy_data).mark_line(point=True).encode(
+            x=alt.X("Year:O"),
+            y=alt.Y("YoY_Change:Q", title="Change from Previous Year (°C)"),
+            color=alt.value("#f45b69"),
+            tooltip=["Year", "YoY_Change"]
+        ).properties(title=f"Year-over-Year Change – {country}", height=350, width=800)
+
+    sel_country = alt.selection_point(fields=["Country"], empty="all")
+    scatter = alt.Chart(yoy_data).mark_circle(size=60).encode(
+        x=alt.X("Year:O", title="Year"),
+        y=alt.Y("TempChange:Q", title="Temperature Change (°C)"),
+        color=alt.Color("TempChange:Q", scale=alt.Scale(scheme="plasma")),
+        opacity=alt.condition(sel_country, alt.value(1), alt.value(0.15)),
+        tooltip=["Country", "Year", "TempChange"]
+    ).add_params(sel_country).properties(title="Raw Temperature Change", height=350, width=800)
+    return (line + year_rule(year)) & (scatter + year_rule(year))
+
+
+def country_scatter_chart(cube, country="All", year=None):
+    countries = cube.countries[:10] if country == "All" else [country]
+    data = fit_scatter(cube.country_frame(countries), "Year", "TempChange")
+    sel_country = alt.selection_point(fields=["Country"], empty="all")
+    points = alt.Chart(data).mark_circle(size=60).encode(
+        x=alt.X("Year:O", title="Year"),
+        y=alt.Y("TempChange:Q", title="Temperature Change (°C)"),
+        color=alt.Color("Country:N" if country == "All" else "TempChange:Q",
+                        scale=alt.Scale(scheme="plasma")),
+        opacity=alt.condition(sel_country, alt.value(1), alt.value(0.15)),
+        tooltip=["Country", "Year", "TempChange"]
+    ).add_params(sel_country)
+    return (points + year_rule(year)).properties(
+        width=800,
+        height=450,
+        title="Annual Temperature Change by Country"
+    )
+
+
+def variability_chart(cube):
+    decreasing = fit_rows(cube.decreasing_variability())
+    return alt.Chart(decreasing).mark_bar().encode(
+        x=alt.X("Delta_Std:Q", title="∆ Std Dev (1993–2024 − 1961–1992)"),
+        y=alt.Y("Country:N", sort="-x"),
+        color=alt.Color("Delta_Std:Q", scale=alt.Scale(scheme="viridis", domainMid=0)),
+        tooltip=["Country", "Std_Early", "Std_Late", "Delta_Std"]
+    ).properties(
+        height=500,
+        width=750,
+        title="Top Countries with Decreasing Yearly Temperature Variability"
+    )
+
+
+def dev_status_charts(cube, grouping=DEV_GROUPING):
+    """(yearly line, 5-year bars) of the mean temperature change per group of `grouping`."""
+    scale = DEV_COLORS if grouping == DEV_GROUPING else alt.Undefined
+    color = alt.Color("Group:N", title=grouping, scale=scale)
+    dev_sel = alt.selection_point(fields=["Group"], bind="legend")
+    dev_avg = fit_line(cube.grouped_yearly_frame(grouping), "Year", "TempChange", group="Group")
+    line_chart = alt.Chart(dev_avg).mark_line(point=True).encode(
+        x=alt.X("Year:O"),
+        y=alt.Y("TempChange:Q", title="Avg Temp Change (°C)"),
+        color=color,
+        opacity=alt.condition(dev_sel, alt.value(1.0), alt.value(0.15)),
+        tooltip=["Year", alt.Tooltip("Group:N", title=grouping), "TempChange"]
+    ).add_params(dev_sel).properties(
+        title=f"Average Temp Change by {grouping}",
+        width=750,
+        height=400
+    )
+
+    dev_bar = fit_buckets(cube.grouped_5yr_frame(grouping), "YearGroup", "TempChange", keys=["Group"])
+    bar_chart = alt.Chart(dev_bar).mark_bar().encode(
+        x=alt.X("YearGroup:O", title="5-Year Group"),
+        y=alt.Y("TempChange:Q", title="Avg Temp Change (°C)"),
+        color=color,
+        opacity=alt.condition(dev_sel, alt.value(1.0), alt.value(0.25)),
+        tooltip=["YearGroup", alt.Tooltip("Group:N", title=grouping), "TempChange"]
+    ).add_params(dev_sel).properties(
+        title=f"5-Year Avg Temp Change by {grouping}",
+        width=750,
+        height=400
+    )
+    return line_chart, bar_chart
+
+
+def warming_rate_chart(cube, trend_range=None, top_n=20, country="All"):
+    """Fastest-warming countries over `trend_range` with 95% CI whiskers; `country` is always shown and highlighted."""
+    trend_range = trend_range or (int(cube.years[0]), int(cube.years[-1]))
+    # All countries are fitted in one batched solve; the full period is precomputed
+    rates = cube.warming_rate_frame(cube.warming_rates(*trend_range))
+    ranking = rates.head(top_n)
+    if country != "All" and country not in set(ranking["Country"]):
+        ranking = pd.concat([ranking, rates[rates["Country"] == country]])
+    ranking = fit_rows(ranking)
+
+    highlight = alt.condition(
+        alt.datum.Country == country,
+        alt.value("#f45b69"),
+        alt.Color("Rate:Q", scale=alt.Scale(scheme="inferno"), legend=None)
+    )
+    rate_bars = alt.Chart(ranking).mark_bar().encode(
+        x=alt.X("Rate:Q", title="Warming Rate (°C per decade)"),
+        y=alt.Y("Country:N", sort="-x", title=None),
+        color=highlight,
+        tooltip=["Country", alt.Tooltip("Rate:Q", format=".3f"), alt.Tooltip("CI_Low:Q", format=".3f"),
+                 alt.Tooltip("CI_High:Q", format=".3f"), alt.Tooltip("R2:Q", format=".2f"), "Years"]
+    )
+    rate_ci = alt.Chart(ranking).mark_rule(color="white").encode(
+        x="CI_Low:Q",
+        x2="CI_High:Q",
+        y=alt.Y("Country:N", sort=alt.EncodingSortField(field="Rate", order="descending"))
+    )
+    return (rate_bars + rate_ci).properties(
+        height=max(300, 22 * len(ranking)),
+        width=750,
+        title=f"Warming Rate by Country, {trend_range[0]}–{trend_range[1]}"
+    )
+
+
+def smoothed_trend_chart(cube, country="All", trend_range=None):
+    """`country`'s yearly temperature change ("All" is the World row) with its rolling mean and trend line."""
+    entity = "World" if country == "All" else country
+    trend_range = trend_range or (int(cube.years[0]), int(cube.years[-1]))
+    series = cube.smoothed_frame(entity, *trend_range).melt("Year", var_name="Series", value_name="TempChange")
+    series = series.dropna(subset=["TempChange"])
+    return alt.Chart(series).mark_line(point=alt.OverlayMarkDef(size=20)).encode(
+        x=alt.X("Year:O", title="Year"),
+        y=alt.Y("TempChange:Q", title="Temperature Change (°C)"),
+        color=alt.Color("Series:N", title=None),
+        strokeDash=alt.StrokeDash("Series:N", legend=None),
+        tooltip=["Year:O", "Series:N", alt.Tooltip("TempChange:Q", format=".2f")]
+    ).properties(
+        height=350,
+        width=750,
+        title=f"Smoothed Temperature Change and Trend for {entity}, {trend_range[0]}–{trend_range[1]}"
+    )
+
+
+def gas_area_chart(gas_store, entity="All", year_range=None):
+    """Stacked warming contribution per gas and source for `entity` ("All" is the World row)."""
+    gas_long = gas_store.entity_frame("World" if entity == "All" else entity, year_range)
+    gas_long = fit_buckets(gas_long, "Year", "Temp Change", keys=["series", "Legend"])
+
+    selection = alt.selection_point(fields=["Legend"])
+    condition = alt.condition(selection, "Legend:N", alt.ColorValue("lightgray"))
+    return alt.Chart(gas_long).mark_area(opacity=0.7).encode(
+        x=alt.X("Year:O", title="Year"),
+        y=alt.Y("Temp Change:Q", title="Temperature Change (°C)"),
+        color=condition,
+        order="series:N",
+        tooltip=["Year:O", "Legend:N", "Temp Change:Q"]
+    ).add_params(selection).properties(
+        width=900,
+        height=500,
+        title=f"Warming Contributions by Gas Type and Emission Source for {entity}" if entity != "All" else "Warming Contributions by Gas Type and Emission Source (Entire World)"
+    )
+
+
+def temp_vs_gas_chart(frame, entity="All"):
+    """Local temperature change against the global warming caused by `entity`'s emissions, on separate axes."""
+    name = "the World" if entity == "All" else entity
+    base = alt.Chart(frame).encode(
+        x=alt.X("Year:O", title="Year"),
+        tooltip=["Year:O", "Temperature Change:Q", "Gas-driven Warming:Q"]
+    )
+    temp = base.mark_line(color="#f45b69").encode(
+        y=alt.Y("Temperature Change:Q", title="Temperature Change (°C)", axis=alt.Axis(titleColor="#f45b69"))
+    )
+    gas = base.mark_line(color="#4c78a8", strokeDash=[6, 3]).encode(
+        y=alt.Y("Gas-driven Warming:Q", title="Gas-driven Global Warming (°C)", axis=alt.Axis(titleColor="#4c78a8"))
+    )
+    return alt.layer(temp, gas).resolve_scale(y="independent").properties(
+        width=900,
+        height=350,
+        title=f"Temperature Change vs Warming Caused by Emissions – {name}"
+    )
@@ -0,0 +1,716 @@
+# 🌍 GLOBAL TEMPERATURE DATA LAYER
+# Loading, preprocessing and on-disk caching for the dashboard datasets.
+import copy
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("climate.data")
+
+DATA_DIR = Path(__file__).resolve().parent
+
+INDICATOR_CSV = DATA_DIR / "Indicator_3_1_Climate_Indicators_Annual_Mean_Global_Surface_Temperature_577579683071085080.csv"
+
+# Snapshots live next to the app unless CLIMATE_CACHE_DIR points elsewhere
+CACHE_DIR = Path(os.environ.get("CLIMATE_CACHE_DIR", DATA_DIR / ".cache"))
+
+# Bump when a builder's output layout changes so stale snapshots are ignored
+SNAPSHOT_VERSION = 2
+
+
+# ─── Source Fingerprints ────────────────────────────
+def file_fingerprint(path):
+    """Return (mtime_ns, size, sha256) for a source file."""
+    path = Path(path)
+    stat = path.stat()
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    return stat.st_mtime_ns, stat.st_size, digest
+
+
+def _read_meta(meta_path):
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _source_digest(stat, path, meta):
+    # Reuse the stored hash while mtime and size are unchanged, so a warm
+    # start never has to read the CSV at all
+    if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+        return meta.get("sha256")
+    return file_fingerprint(path)[2]
+
+
+# ─── Columnar Snapshots ─────────────────────────────
+def cached_frame(name, source, build, extend=None):
+    """Load `name` from its Parquet snapshot, rebuilding it from `source` when the file changed.
+
+    `build` receives the source path and must return a DataFrame. Snapshots are
+    written atomically; if the cache directory is not writable the freshly built
+    frame is returned without persisting it.
+
+    `extend(frame, lines, meta)`, when given, is tried before a rebuild: it gets
+    the previous snapshot, the new file's lines and the previous stamp, and
+    returns the snapshot with the appended years added after the existing rows,
+    or None when the change is not a pure append.
+    """
+    source = Path(source)
+    data_path = CACHE_DIR / f"{name}.parquet"
+    meta_path = CACHE_DIR / f"{name}.json"
+
+    stat = source.stat()
+    meta = _read_meta(meta_path)
+    digest = _source_digest(stat, source, meta)
+
+    if (
+        meta.get("sha256") == digest
+        and meta.get("version") == SNAPSHOT_VERSION
+        and data_path.exists()
+    ):
+        try:
+            frame = pd.read_parquet(data_path)
+        except Exception:
+            frame = None
+        if frame is not None:
+            if meta.get("mtime_ns") != stat.st_mtime_ns:
+                # Content is identical (e.g. fresh checkout); just refresh the stamp
+                try:
+                    _write_meta(meta_path, stat, digest, **_meta_extra(meta))
+                except OSError:
+                    pass
+            return frame
+
+    frame, extra = None, {}
+    if extend is not None:
+        lines = source.read_bytes().splitlines()
+        if meta.get("version") == SNAPSHOT_VERSION and meta.get("lines_sha256") and data_path.exists():
+            try:
+                frame = extend(pd.read_parquet(data_path), lines, meta)
+            except (OSError, ValueError, KeyError, IndexError) as exc:
+                logger.warning("%s: incremental update failed (%r), rebuilding from %s", name, exc, source.name)
+                frame = None
+            else:
+                if frame is None:
+                    logger.info("%s: %s changed beyond appended years, rebuilding", name, source.name)
+        # `lineage` lists the earlier versions this snapshot extends, with their row counts
+        lineage = meta.get("lineage", []) + [[meta["sha256"], meta["rows"]]] if frame is not None else []
+        extra = {"lines_sha256": _lines_digest(lines), "rows": None, "lineage": lineage}
+    if frame is None:
+        frame = build(source)
+    if extra:
+        extra["rows"] = len(frame)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _atomic_write(data_path, lambda f: frame.to_parquet(f, index=False))
+        _write_meta(meta_path, stat, digest, **extra)
+    except (OSError, ImportError, ValueError):
+        pass
+    return frame
+
+
+def _atomic_write(path, write):
+    # Each writer gets its own temp file, so concurrent rebuilds of one snapshot (warm-up
+    # threads, deploy processes) never interleave; os.replace publishes one of them whole
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates 0600; snapshots stay readable by a server running as another user
+        os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_meta(meta_path, stat, digest, **extra):
+    text = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest,
+        **extra,
+    })
+    _atomic_write(meta_path, lambda f: f.write(text.encode()))
+
+
+def _meta_extra(meta):
+    return {k: v for k, v in meta.items() if k not in ("version", "mtime_ns", "size", "sha256")}
+
+
+# ─── Appended Years ─────────────────────────────────
+# The sources grow by a year at a time: a new trailing year column (Indicator)
+# or new rows for the new year (gas, contributions). A change is treated as an
+# append only when the file minus the new year hashes exactly to the previous
+# file, so revised values in earlier years always force a rebuild.
+def _lines_digest(lines):
+    # Line endings are normalized, so CRLF/LF and a missing final newline do not count as changes
+    return hashlib.sha256(b"\n".join(lines) + b"\n").hexdigest()
+
+
+def _append_rows(frame, added):
+    """`frame` followed by `added`; categorical columns stay categorical, existing codes untouched."""
+    columns = {}
+    for col in frame.columns:
+        old, new = frame[col], added[col]
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            extra = pd.Index(new.dropna().unique()).difference(old.cat.categories)
+            categories = old.cat.categories.append(extra)
+            codes = np.concatenate([old.cat.codes.to_numpy(), categories.get_indexer(new)])
+            columns[col] = pd.Categorical.from_codes(codes, categories=categories)
+        else:
+            columns[col] = pd.concat([old, new.astype(old.dtype)], ignore_index=True)
+    out = pd.DataFrame(columns)
+    out.attrs = frame.attrs
+    return out
+
+
+def extend_year_rows(build):
+    """`cached_frame` extend hook for long CSVs (Entity, Code, Year, values...) that gain rows for new years.
+
+    Only the new rows are handed to `build`, as an in-memory CSV.
+    """
+    def extend(frame, lines, meta):
+        last_year = int(frame["Year"].max())
+        header, rows = lines[0], lines[1:]
+        # pyarrow's reader converts only Year and is several times faster here than
+        # the C engine, which still tokenizes every value column
+        years = pd.read_csv(io.BytesIO(b"\n".join(lines)), usecols=["Year"], engine="pyarrow")["Year"]
+        if len(years) != len(rows):
+            return None
+        is_new = (years > last_year).tolist()
+        kept = [header] + [row for row, new in zip(rows, is_new) if not new]
+        if _lines_digest(kept) != meta["lines_sha256"]:
+            return None
+        if not any(is_new):
+            return frame
+        added = build(io.BytesIO(b"\n".join([header] + [row for row, new in zip(rows, is_new) if new])))
+        return _append_rows(frame, added)
+    return extend
+
+
+
+# ─── Country Registry ───────────────────────────────
+# Codes that name the same place differently across sources
+CODE_ALIASES = {"OWID_WRL": "WLD"}
+
+
+class CountryRegistry:
+    """Process-wide integer ids for ISO3 country codes, shared by every dataset.
+
+    Country names differ between sources ("Afghanistan, Islamic Rep. of" in
+    the Indicator file, "Afghanistan" in the Our World in Data files), so
+    each dataset interns its code column once at load and keeps the ids.
+    Ids are assigned in first-seen order and never change within a process;
+    rows without a code (regions, income groups) map to -1.
+    """
+
+    def __init__(self, aliases=CODE_ALIASES):
+        self._lock = threading.Lock()
+        self._aliases = dict(aliases)
+        self._ids = {}
+        self.codes = []
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _keys(self, codes):
+        # Factorize first so the Python-level work is per distinct code, not per row
+        inverse, uniques = pd.factorize(pd.Series(codes, dtype=object))
+        keys = [self._aliases.get(c.strip(), c.strip()) if isinstance(c, str) and c.strip() else None
+                for c in uniques]
+        return keys, inverse
+
+    def _ids_for(self, keys, inverse):
+        # A trailing -1 serves the factorize NA sentinel (inverse == -1)
+        ids = np.array([self._ids.get(k, -1) if k is not None else -1 for k in keys] + [-1], dtype=np.int32)
+        return ids[inverse]
+
+    def intern(self, codes):
+        """int32 id per entry of `codes`, registering codes not seen before."""
+        keys, inverse = self._keys(codes)
+        with self._lock:
+            for key in keys:
+                if key is not None and key not in self._ids:
+                    self._ids[key] = len(self.codes)
+                    self.codes.append(key)
+            return self._ids_for(keys, inverse)
+
+    def lookup(self, codes):
+        """Like intern, but unregistered codes map to -1."""
+        keys, inverse = self._keys(codes)
+        with self._lock:
+            return self._ids_for(keys, inverse)
+
+    def id_of(self, code):
+        return int(self.lookup([code])[0])
+
+
+COUNTRIES = CountryRegistry()
+
+
+class CountryIndex:
+    """Position of each country id among one dataset's rows (or entities).
+
+    The array side of a cross-dataset join: positions() maps another
+    dataset's ids onto this one in a single vectorized lookup.
+    """
+
+    def __init__(self, ids):
+        ids = np.asarray(ids, dtype=np.int32)
+        known = np.flatnonzero(ids >= 0)
+        self._positions = np.full(int(ids[known].max()) + 1 if len(known) else 0, -1, dtype=np.intp)
+        self._positions[ids[known]] = known
+        self._positions.setflags(write=False)
+
+    def positions(self, ids):
+        """Position per id in `ids`, -1 where this dataset has no such country."""
+        ids = np.asarray(ids)
+        out = np.full(ids.shape, -1, dtype=np.intp)
+        known = (ids >= 0) & (ids < len(self._positions))
+        out[known] = self._positions[ids[known]]
+        return out
+
+    def position(self, country_id):
+        return int(self.positions([country_id])[0])
+
+
+def intern_countries(codes):
+    """Read-only registry ids for `codes`, plus their CountryIndex."""
+    ids = COUNTRIES.intern(codes)
+    ids.setflags(write=False)
+    return ids, CountryIndex(ids)
+
+
+# ─── Indicator Temperature Data ─────────────────────
+def build_indicator_long(path=INDICATOR_CSV):
+    df = pd.read_csv(path)
+    year_cols = [c for c in df.columns if c.isdigit()]
+    df_long = df.melt(
+        id_vars=["Country", "ISO2", "ISO3", "Indicator", "Unit"],
+        value_vars=year_cols,
+        var_name="Year",
+        value_name="TempChange"
+    )
+    df_long["Year"] = df_long["Year"].astype(np.int16)
+    df_long.sort_values(["Country", "Year"], inplace=True, kind="stable")
+    df_long.reset_index(drop=True, inplace=True)
+
+    # Repeated labels are stored once per category instead of once per row
+    for col in ["Country", "ISO2", "ISO3", "Indicator", "Unit"]:
+        df_long[col] = df_long[col].astype("category")
+
+    return df_long
+
+
+def extend_indicator_long(frame, lines, meta):
+    """`cached_frame` extend hook: melt only the year columns appended to the end of the Indicator CSV."""
+    last_year = int(frame["Year"].max())
+    header = lines[0].split(b",")
+    new_years = [c.decode() for c in header if c.strip().isdigit() and int(c) > last_year]
+    k = len(new_years)
+    if k == 0 or [c.decode() for c in header[-k:]] != new_years:
+        return None
+    # New cells are numeric, so the last k fields split cleanly from the right
+    split = [line.rsplit(b",", k) for line in lines]
+    if _lines_digest([parts[0] for parts in split]) != meta["lines_sha256"]:
+        return None
+    # Parsed cell by cell rather than with read_csv, which would drop a row whose new cells are all blank
+    rows = split[1:]
+    if any(len(parts) != k + 1 for parts in rows):
+        return None
+    values = pd.DataFrame({
+        year: pd.to_numeric(pd.Series([parts[j + 1].strip().strip(b'"').decode() for parts in rows]), errors="coerce")
+        for j, year in enumerate(new_years)
+    })
+
+    # Rows are unchanged, so each keeps its country; only that key field of the old part is parsed
+    key = header.index(b"Country")
+    values["Country"] = [next(csv.reader([parts[0].decode("utf-8")]))[key] for parts in split[1:]]
+    ids = frame.drop_duplicates("Country").set_index("Country")[["ISO2", "ISO3", "Indicator", "Unit"]]
+    if not values["Country"].isin(ids.index).all():
+        return None
+    added = values.melt(id_vars="Country", var_name="Year", value_name="TempChange")
+    added["Year"] = added["Year"].astype(np.int16)
+    added = added.join(ids, on="Country")
+    return _append_rows(frame, added)
+
+
+def load_indicator_long(path=INDICATOR_CSV):
+    return cached_frame("indicator_long", path, build_indicator_long, extend_indicator_long)
+
+
+# ─── Warming Gases Data ─────────────────────────────
+GAS_CSV = DATA_DIR / "global-warming-by-gas-and-source.csv"
+
+GAS_SERIES = ["N2O_FF&I", "N2O_AgLU", "CH4_FF&I", "CH4_AgLU", "CO2_FF&I", "CO2_AgLU"]
+
+GAS_LABELS = {
+    "CO2_FF&I": "CO₂ (Fossil Fuels & Industry)",
+    "CO2_AgLU": "CO₂ (Agriculture & Land Use)",
+    "CH4_FF&I": "CH₄ (Fossil Fuels & Industry)",
+    "CH4_AgLU": "CH₄ (Agriculture & Land Use)",
+    "N2O_FF&I": "N₂O (Fossil Fuels & Industry)",
+    "N2O_AgLU": "N₂O (Agriculture & Land Use)"
+}
+
+
+def short_gas_name(col):
+    return (
+        "N2O_FF&I" if "nitrous oxide" in col and "fossil fuels" in col else
+        "N2O_AgLU" if "nitrous oxide" in col else
+        "CH4_FF&I" if "methane" in col and "fossil fuels" in col else
+        "CH4_AgLU" if "methane" in col else
+        "CO2_FF&I" if "fossil fuels" in col else
+        "CO2_AgLU"
+    )
+
+
+def build_gas_wide(path=GAS_CSV):
+    df = pd.read_csv(path)
+    gas_cols = [c for c in df.columns if c.startswith("Change in")]
+    df = df.rename(columns={col: short_gas_name(col) for col in gas_cols})
+    df = df[["Entity", "Code", "Year"] + GAS_SERIES]
+    df["Year"] = df["Year"].astype(np.int16)
+    df["Entity"] = df["Entity"].astype("category")
+    df["Code"] = df["Code"].astype("category")
+    df = df.sort_values(["Entity", "Year"], kind="stable").reset_index(drop=True)
+    return df
+
+
+def load_gas_wide(path=GAS_CSV):
+    return cached_frame("gas_wide", path, build_gas_wide, extend_year_rows(build_gas_wide))
+
+
+class GasStore:
+    """Chart-ready long (Year, series, Temp Change, Legend) warming-gas rows with a row index per Entity.
+
+    Rows are only ever appended; each entity's index lists its rows by Year,
+    so a year range is two bisections on that entity's years rather than a
+    boolean scan over the whole table.
+    """
+
+    def __init__(self, wide):
+        self._long, self._rows = self._melt(wide, offset=0)
+        self._codes = self._entity_codes(wide)
+        self._set_summary()
+
+    @staticmethod
+    def _entity_codes(wide):
+        firsts = wide.drop_duplicates("Entity")
+        return dict(zip(firsts["Entity"].astype(str), firsts["Code"].astype(object)))
+
+    @staticmethod
+    def _melt(wide, offset):
+        """Long rows of `wide` sorted by Entity, Year and series, and each Entity's row positions (+ `offset`)."""
+        long = wide.melt(
+            id_vars=["Entity", "Year"],
+            value_vars=GAS_SERIES,
+            var_name="series",
+            value_name="Temp Change"
+        )
+        long["series"] = pd.Categorical(long["series"], categories=GAS_SERIES)
+        long["Legend"] = pd.Categorical(long["series"].map(GAS_LABELS), categories=[GAS_LABELS[s] for s in GAS_SERIES])
+
+        codes, names = pd.factorize(long["Entity"].astype(str))
+        order = np.lexsort((long["series"].cat.codes.to_numpy(), long["Year"].to_numpy(), codes))
+        codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], len(codes)]
+        rows = {names[codes[start]]: np.arange(start, end) + offset for start, end in zip(starts, ends)}
+        columns = long[["Year", "series", "Temp Change", "Legend"]]
+        return columns.take(order).reset_index(drop=True), rows
+
+    def _set_summary(self):
+        self._years = self._long["Year"].to_numpy()
+        self.entities = sorted(self._rows)
+        self._entity_pos = {e: i for i, e in enumerate(self.entities)}
+        self.entity_ids, self.by_id = intern_countries([self._codes.get(e) for e in self.entities])
+        self.year_min = int(self._years.min())
+        self.year_max = int(self._years.max())
+
+    def __contains__(self, entity):
+        return entity in self._rows
+
+    def extended(self, rows):
+        """A new store with the later years in `rows` (wide gas rows) appended.
+
+        Only the new rows are melted; existing rows and their per-entity
+        indexes are kept as they are. Returns None when a row is not after its
+        entity's last year, in which case the store has to be rebuilt.
+        """
+        if len(rows) == 0:
+            return self
+        offset = len(self._long)
+        long, added = self._melt(rows, offset)
+        merged = dict(self._rows)
+        for entity, positions in added.items():
+            if entity in merged:
+                if long["Year"].iat[positions[0] - offset] <= self._years[merged[entity][-1]]:
+                    return None
+                positions = np.concatenate([merged[entity], positions])
+            merged[entity] = positions
+
+        store = copy.copy(self)
+        store._long = pd.concat([self._long, long], ignore_index=True)
+        store._rows = merged
+        store._codes = {**self._entity_codes(rows), **self._codes}
+        store._set_summary()
+        return store
+
+    def entity_frame(self, entity, year_range=None):
+        """Long-format (Year, series, Temp Change, Legend) rows for `entity`, optionally within an inclusive year range."""
+        positions = self._rows[entity]
+        if year_range is not None:
+            years = self._years[positions]
+            lo = np.searchsorted(years, year_range[0], side="left")
+            hi = np.searchsorted(years, year_range[1], side="right")
+            positions = positions[lo:hi]
+        return self._long.take(positions).reset_index(drop=True)
+
+    def entity_id(self, entity):
+        """Registry id of `entity`; -1 for regions and groups without a country code."""
+        return int(self.entity_ids[self._entity_pos[entity]])
+
+    def warming_by_year(self, entity):
+        """(years, warming summed over every gas and source) for `entity`."""
+        positions = self._rows[entity]
+        n = len(GAS_SERIES)
+        # Each entity's rows are ordered by Year, then series, so every year is one run of n rows
+        total = self._long["Temp Change"].to_numpy()[positions].reshape(-1, n).sum(axis=1)
+        return self._years[positions[::n]], total
+
+
+def load_gas_store(path=GAS_CSV):
+    return GasStore(load_gas_wide(path))
+
+
+# ─── Warming Contributions Data ─────────────────────
+CONTRIBUTIONS_CSV = DATA_DIR / "contributions-global-temp-change.csv"
+
+
+def build_contributions(path=CONTRIBUTIONS_CSV):
+    df = pd.read_csv(path)
+    df = df.rename(columns={"Share of contribution to global warming": "Share"})
+    df["Year"] = df["Year"].astype(np.int16)
+    df["Entity"] = df["Entity"].astype("category")
+    df["Code"] = df["Code"].astype("category")
+    return df.sort_values(["Entity", "Year"], kind="stable").reset_index(drop=True)
+
+
+def load_contributions(path=CONTRIBUTIONS_CSV):
+    return cached_frame("contributions", path, build_contributions, extend_year_rows(build_contributions))
+
+
+# ─── Food Production vs Temperature Data ────────────
+FOOD_TEMP_CSV = DATA_DIR / "temp_change_df (1).csv"
+
+FOOD_VALUE = "Food Gross Production Value (constant 2014-2016 thousand US$)"
+
+
+def compact_frame(df, max_category_ratio=0.5):
+    """Shrink a frame in place of a plain CSV parse.
+
+    Constant columns are dropped and kept once in `attrs["constants"]`,
+    text columns with few distinct values become categoricals, and numeric
+    columns are downcast to the smallest integer or float32 type that holds them.
+    """
+    constants = {}
+    out = {}
+    for col in df.columns:
+        series = df[col]
+        if series.nunique(dropna=False) <= 1:
+            value = series.iloc[0] if len(series) else None
+            constants[col] = None if pd.isna(value) else (value.item() if hasattr(value, "item") else value)
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            out[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            out[col] = series.astype(np.float32)
+        elif series.nunique() <= max_category_ratio * len(series):
+            out[col] = series.astype("category")
+        else:
+            out[col] = series
+    compact = pd.DataFrame(out)
+    compact.attrs["constants"] = constants
+    return compact
+
+
+def build_food_temp(path=FOOD_TEMP_CSV):
+    df = pd.read_csv(path, index_col=0)
+    df = df.sort_values(["Entity", "Year"], kind="stable").reset_index(drop=True)
+    return compact_frame(df)
+
+
+def load_food_temp(path=FOOD_TEMP_CSV):
+    return cached_frame("food_temp", path, build_food_temp)
+
+
+# ─── Country Groupings ──────────────────────────────
+# Classification tables keyed by ISO3: (CSV, {column: (grouping, groups)}), where a value
+# outside `groups` leaves the country unassigned and groups=None takes every distinct value.
+# The default reuses the OECD / least-developed status already in the food file.
+GROUP_TABLES = [
+    (FOOD_TEMP_CSV, {"DevStaus": ("Development Status", ["Developed", "Developing"])}),
+]
+
+# An extra table (ISO3 plus e.g. Income or Region columns); each other column becomes a grouping
+GROUPS_CSV = os.environ.get("CLIMATE_GROUPS_CSV")
+
+DEV_GROUPING = "Development Status"
+
+
+def _group_table(path, columns):
+    # The food file already has a columnar snapshot with ISO3 and DevStaus; re-parsing
+    # the 3.8 MB CSV would dominate every TrendCube build
+    if Path(path) == FOOD_TEMP_CSV:
+        table = load_food_temp(path)
+    else:
+        table = pd.read_csv(path, dtype=str)
+    keep = [c for c in table.columns if c != "ISO3" and (columns is None or c in columns)]
+    table = table[["ISO3"] + keep].drop_duplicates("ISO3").astype(object)
+    return table.where(table.notna())
+
+
+def load_country_groups(tables=None):
+    """ISO3-indexed frame with one categorical column per grouping; later tables override earlier ones."""
+    if tables is None:
+        tables = GROUP_TABLES + ([(Path(GROUPS_CSV), None)] if GROUPS_CSV else [])
+    groupings = {}
+    for path, columns in tables:
+        table = _group_table(path, columns)
+        table["ISO3"] = table["ISO3"].str.strip()
+        table = table.dropna(subset=["ISO3"]).drop_duplicates("ISO3").set_index("ISO3")
+        for col in table.columns:
+            grouping, groups = (columns or {}).get(col, (col, None))
+            values = table[col].str.strip()
+            groupings[grouping] = pd.Series(
+                pd.Categorical(values, categories=groups or sorted(values.dropna().unique())), index=table.index
+            )
+    return pd.DataFrame(groupings)
+
+
+def groups_version(tables=None):
+    """Combined content hash of the classification tables, for keying anything built on load_country_groups()."""
+    if tables is None:
+        tables = GROUP_TABLES + ([(Path(GROUPS_CSV), None)] if GROUPS_CSV else [])
+    return hashlib.sha256(" ".join(f"{path}={dataset_version(path)}" for path, _ in tables).encode()).hexdigest()
+
+
+# ─── Monthly Temperature Cube ───────────────────────
+MONTHLY_CSV = DATA_DIR / "monthly-average-surface-temperatures-by-year.csv"
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+class MonthlyCube:
+    """Average surface temperature as an entity × year × month float32 array.
+
+    `values` is normally a read-only memory map of the on-disk snapshot, so
+    indexing one entity only pages in that entity's 12·n_years values and
+    every process on the host shares the same page cache.
+    """
+
+    def __init__(self, values, entities, codes, years):
+        self.values = values
+        self.entities = list(entities)
+        self.codes = list(codes)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.entity_index = {e: i for i, e in enumerate(self.entities)}
+        self.entity_ids, self.by_id = intern_countries(self.codes)
+
+    def entity_block(self, entity, year_range=None):
+        """year × month array for one entity, read lazily from the map."""
+        block = self.values[self.entity_index[entity]]
+        if year_range is None:
+            return np.asarray(block), self.years
+        lo = np.searchsorted(self.years, year_range[0], side="left")
+        hi = np.searchsorted(self.years, year_range[1], side="right")
+        return np.asarray(block[lo:hi]), self.years[lo:hi]
+
+
+def build_monthly_array(path=MONTHLY_CSV):
+    df = pd.read_csv(path)
+    # Year columns arrive in descending, partly shuffled order; the "Year" column is the month number
+    year_cols = sorted((c for c in df.columns if c.isdigit()), key=int)
+    df = df.sort_values(["Entity", "Year"], kind="stable")
+    entities = pd.unique(df["Entity"])
+    codes = df.drop_duplicates("Entity").set_index("Entity")["Code"].reindex(entities).fillna("")
+
+    values = np.full((len(entities), len(year_cols), 12), np.nan, dtype=np.float32)
+    entity_idx = pd.Categorical(df["Entity"], categories=entities).codes
+    month_idx = df["Year"].to_numpy() - 1
+    values[entity_idx, :, month_idx] = df[year_cols].to_numpy(dtype=np.float32)
+    return values, list(entities), list(codes), [int(y) for y in year_cols]
+
+
+def load_monthly_cube(path=MONTHLY_CSV):
+    """Memory-mapped MonthlyCube, converting the CSV to a .npy snapshot only when it changed."""
+    source = Path(path)
+    data_path = CACHE_DIR / "monthly_cube.npy"
+    meta_path = CACHE_DIR / "monthly_cube.json"
+
+    stat = source.stat()
+    meta = _read_meta(meta_path)
+    digest = _source_digest(stat, source, meta)
+    if meta.get("sha256") == digest and meta.get("version") == SNAPSHOT_VERSION and data_path.exists():
+        try:
+            values = np.load(data_path, mmap_mode="r")
+            return MonthlyCube(values, meta["entities"], meta["codes"], meta["years"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    values, entities, codes, years = build_monthly_array(source)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _atomic_write(data_path, lambda f: np.save(f, values))
+        _write_meta(meta_path, stat, digest, entities=entities, codes=codes, years=years)
+        values = np.load(data_path, mmap_mode="r")
+    except OSError:
+        # Unwritable cache: keep the in-memory array
+        pass
+    return MonthlyCube(values, entities, codes, years)
+
+
+def _snapshot_name(path):
+    return {
+        INDICATOR_CSV: "indicator_long",
+        GAS_CSV: "gas_wide",
+        CONTRIBUTIONS_CSV: "contributions",
+        FOOD_TEMP_CSV: "food_temp",
+        MONTHLY_CSV: "monthly_cube",
+    }.get(Path(path))
+
+
+def dataset_version(path=INDICATOR_CSV):
+    """Content hash of a source file, answered from its snapshot stamp when mtime/size are unchanged."""
+    path = Path(path)
+    name = _snapshot_name(path)
+    meta = _read_meta(CACHE_DIR / f"{name}.json") if name else {}
+    return _source_digest(path.stat(), path, meta)
+
+
+def appended_since(path, version):
+    """Row offset in the current snapshot of `path` where rows appended after `version` start.
+
+    None when the snapshot does not extend `version` by appending (a rebuild,
+    or an unrelated version), so anything derived from `version` must be rebuilt.
+    """
+    name = _snapshot_name(path)
+    meta = _read_meta(CACHE_DIR / f"{name}.json") if name else {}
+    if meta.get("sha256") == version:
+        return meta.get("rows")
+    return dict(map(tuple, meta.get("lineage", []))).get(version)
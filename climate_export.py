@@ -0,0 +1,245 @@
+# 📦 STATIC CHART EXPORT
+# Pre-renders every dashboard chart for every country as Vega-Lite JSON (and
+# optionally standalone HTML) so the common views can be served from a CDN.
+#
+#   python climate_export.py                          # export into static_charts/
+#   python climate_export.py --html --workers 8       # also write .html pages
+#
+# Each output records a hash of the data it was built from in manifest.json;
+# reruns only rebuild charts whose inputs (or the code that builds them) changed.
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import climate_analytics
+import climate_charts
+import climate_data
+
+MANIFEST = "manifest.json"
+
+# Bump to force a full re-export when the output layout changes
+EXPORT_VERSION = 1
+
+KINDS = ["yoy", "scatter", "variability", "devstatus_line", "devstatus_bars", "warming_rate", "gas"]
+
+
+# ─── Input Hashes ───────────────────────────────────
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+# Modules whose code shapes the exported charts: the builders themselves, the cube and
+# trend metrics they plot, and the loaders, group tables and gas store behind those
+CODE_MODULES = [climate_charts, climate_analytics, climate_data]
+
+
+def code_digest():
+    """Chart, analytics and data-layer code plus budget settings; a change to any invalidates every output."""
+    sources = [Path(module.__file__).read_bytes() for module in CODE_MODULES]
+    return _digest(EXPORT_VERSION, climate_data.SNAPSHOT_VERSION, *sources, climate_charts.RENDER_MODE,
+                   climate_charts.MAX_POINTS, climate_charts.MAX_BYTES)
+
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "all"
+
+
+def plan_targets(cube, gas_store, kinds=KINDS):
+    """(kind, key, input digest) for every chart to export.
+
+    Per-country charts hash only the rows they read, so a revision to one
+    country's series re-exports that country alone.
+    """
+    base = code_digest()
+    years = cube.years.tobytes()
+
+    def rows_digest(kind, key, countries):
+        rows = [cube.country_index[c] for c in countries]
+        return _digest(base, kind, key, years, cube.temp[rows].tobytes())
+
+    targets = []
+    countries = ["All"] + cube.countries
+    if "yoy" in kinds:
+        targets += [("yoy", c, rows_digest("yoy", c, cube.sample_countries() if c == "All" else [c]))
+                    for c in countries]
+    if "scatter" in kinds:
+        targets += [("scatter", c, rows_digest("scatter", c, cube.countries[:10] if c == "All" else [c]))
+                    for c in countries]
+
+    # Whole-dataset charts depend on every row
+    groups = [part for name, codes in cube.group_codes.items() for part in (name, *cube.groupings[name], codes.tobytes())]
+    whole = _digest(base, years, cube.temp.tobytes(), *groups, "\0".join(cube.iso3))
+    targets += [(kind, "All", _digest(whole, kind)) for kind in
+                ("variability", "devstatus_line", "devstatus_bars", "warming_rate") if kind in kinds]
+
+    if "gas" in kinds:
+        for entity in ["All"] + gas_store.entities:
+            block = gas_store.entity_frame("World" if entity == "All" else entity)
+            values = np.ascontiguousarray(block[["Year", "Temp Change"]].to_numpy(dtype=float)).tobytes()
+            targets.append(("gas", entity, _digest(base, "gas", entity, values)))
+    return targets
+
+
+# ─── Workers ────────────────────────────────────────
+_worker = {}
+
+
+def _init_worker(cache_dir):
+    # Snapshots were refreshed by the parent, so each worker only reads Parquet
+    climate_data.CACHE_DIR = Path(cache_dir)
+    climate_charts.alt.data_transformers.disable_max_rows()
+
+
+def _data(name):
+    if name not in _worker:
+        if name == "cube":
+            _worker[name] = climate_analytics.TrendCube(climate_data.load_indicator_long())
+        else:
+            _worker[name] = climate_data.load_gas_store()
+    return _worker[name]
+
+
+def build_chart(kind, key):
+    if kind == "gas":
+        return climate_charts.gas_area_chart(_data("gas"), key)
+    cube = _data("cube")
+    if kind == "yoy":
+        return climate_charts.yoy_chart(cube, key)
+    if kind == "scatter":
+        return climate_charts.country_scatter_chart(cube, key)
+    if kind == "variability":
+        return climate_charts.variability_chart(cube)
+    if kind == "devstatus_line":
+        return climate_charts.dev_status_charts(cube)[0]
+    if kind == "devstatus_bars":
+        return climate_charts.dev_status_charts(cube)[1]
+    if kind == "warming_rate":
+        return climate_charts.warming_rate_chart(cube)
+    raise ValueError(f"unknown chart kind: {kind}")
+
+
+def _write_atomic(path, text):
+    # A unique temp file per writer, so overlapping export runs never write into
+    # each other's file; os.replace publishes one of them whole
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates 0600; the exported files are served as static content
+        os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def render_target(kind, key, out_dir, html):
+    """Write one chart; returns the written paths relative to `out_dir`."""
+    # The builders' specs are already validated whenever the dashboard renders
+    # them; schema validation would otherwise be most of the export time
+    spec = build_chart(kind, key).to_dict(validate=False)
+    out_dir = Path(out_dir)
+    (out_dir / kind).mkdir(parents=True, exist_ok=True)
+    stem = f"{kind}/{slugify(key)}"
+    files = [f"{stem}.vl.json"]
+    _write_atomic(out_dir / files[0], json.dumps(spec, separators=(",", ":"), ensure_ascii=False))
+    if html:
+        alt = climate_charts.alt
+        files.append(f"{stem}.html")
+        _write_atomic(out_dir / files[1], alt.utils.spec_to_html(
+            spec, mode="vega-lite", vega_version=alt.VEGA_VERSION,
+            vegaembed_version=alt.VEGAEMBED_VERSION, vegalite_version=alt.VEGALITE_VERSION,
+        ))
+    return files
+
+
+def _render_batch(batch):
+    return [render_target(*task) for task in batch]
+
+
+# ─── Export ─────────────────────────────────────────
+def export(out_dir="static_charts", html=False, workers=None, force=False, kinds=KINDS):
+    """Render every stale chart into `out_dir` across a process pool; returns (written, skipped)."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+
+    # Loading here also refreshes the snapshots the workers read
+    cube = climate_analytics.TrendCube(climate_data.load_indicator_long())
+    gas_store = climate_data.load_gas_store()
+    targets = plan_targets(cube, gas_store, kinds)
+
+    seen = {}
+    for kind, key, _ in targets:
+        slug = f"{kind}/{slugify(key)}"
+        if seen.setdefault(slug, key) != key:
+            raise ValueError(f"{key!r} and {seen[slug]!r} map to the same file {slug}")
+
+    def fresh(kind, key, digest):
+        entry = manifest.get(f"{kind}/{key}")
+        return (
+            not force
+            and entry is not None
+            and entry["digest"] == digest
+            and (not html or any(f.endswith(".html") for f in entry["files"]))
+            and all((out_dir / f).exists() for f in entry["files"])
+        )
+
+    stale = [(kind, key, digest) for kind, key, digest in targets if not fresh(kind, key, digest)]
+    tasks = [(kind, key, str(out_dir), html) for kind, key, _ in stale]
+
+    workers = workers or os.cpu_count() or 1
+    # A few batches per worker keeps the pool busy without paying IPC per chart
+    size = max(1, len(tasks) // (workers * 4))
+    batches = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+    results = []
+    if batches:
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches)), initializer=_init_worker,
+                                 initargs=(str(climate_data.CACHE_DIR),)) as pool:
+            for files in pool.map(_render_batch, batches):
+                results += files
+
+    for (kind, key, digest), files in zip(stale, results):
+        manifest[f"{kind}/{key}"] = {"digest": digest, "files": files}
+    _write_atomic(manifest_path, json.dumps(manifest, indent=1, sort_keys=True))
+    return len(stale), len(targets) - len(stale)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render every dashboard chart as static Vega-Lite files.")
+    parser.add_argument("--out", default="static_charts", help="output directory (default static_charts)")
+    parser.add_argument("--html", action="store_true", help="also write a standalone .html page per chart")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="re-render even when the inputs are unchanged")
+    parser.add_argument("--kind", action="append", choices=KINDS, dest="kinds",
+                        help="only export this chart kind (repeatable)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    written, skipped = export(args.out, args.html, args.workers, args.force, args.kinds or KINDS)
+    print(f"Exported {written} charts, {skipped} unchanged, to {args.out} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+# 🛠️ DASHBOARD PROFILING
+# Opt-in timing of each dashboard section. Enable with CLIMATE_PROFILE=1 or the
+# ?profile=1 query parameter; when disabled every hook is a no-op.
+#
+# Each profiled rerun reports per-stage wall time, net allocated blocks and
+# chart payload sizes to a sidebar debug panel and as one JSON log line per
+# stage. Setting CLIMATE_METRICS_PORT also serves the running totals in
+# Prometheus text format at http://<host>:<port>/metrics, and the startup
+# warm-up state at /ready (200 once every dataset is loaded, 503 before).
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+logger = logging.getLogger("climate.profile")
+
+PROFILE_ENV = os.environ.get("CLIMATE_PROFILE", "").lower() in ("1", "true", "yes", "on")
+METRICS_PORT = os.environ.get("CLIMATE_METRICS_PORT")
+
+# Stages of the most recent profiled rerun in this process (read by the benchmarks)
+LAST_RUN = []
+
+
+# ─── Process-wide Totals ────────────────────────────
+class MetricsRegistry:
+    """Running per-stage and per-chart totals shared by every session in the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._charts = {}
+        self._startup = {}
+        # Set by climate_warmup.start; None means no warm-up, which counts as ready
+        self.readiness = None
+
+    def is_ready(self):
+        return self.readiness is None or self.readiness()
+
+    def record_startup(self, timings, errors=()):
+        with self._lock:
+            self._startup = {name: (seconds, name not in errors) for name, seconds in timings.items()}
+
+    def record(self, stages):
+        with self._lock:
+            for s in stages:
+                total = self._stages.setdefault(s["stage"], {"count": 0, "seconds": 0.0, "max": 0.0})
+                total["count"] += 1
+                total["seconds"] += s["wall_ms"] / 1000
+                total["max"] = max(total["max"], s["wall_ms"] / 1000)
+                if "payload_bytes" in s:
+                    self._charts[s["stage"]] = s["payload_bytes"]
+
+    def prometheus_text(self):
+        with self._lock:
+            stages = {k: dict(v) for k, v in self._stages.items()}
+            charts = dict(self._charts)
+            startup = dict(self._startup)
+        lines = [
+            "# HELP climate_stage_seconds_total Wall time spent in each dashboard stage.",
+            "# TYPE climate_stage_seconds_total counter",
+        ]
+        lines += [f'climate_stage_seconds_total{{stage="{_escape(k)}"}} {v["seconds"]:.6f}' for k, v in stages.items()]
+        lines += ["# HELP climate_stage_runs_total Profiled executions of each dashboard stage.",
+                  "# TYPE climate_stage_runs_total counter"]
+        lines += [f'climate_stage_runs_total{{stage="{_escape(k)}"}} {v["count"]}' for k, v in stages.items()]
+        lines += ["# HELP climate_stage_seconds_max Slowest observed execution of each stage.",
+                  "# TYPE climate_stage_seconds_max gauge"]
+        lines += [f'climate_stage_seconds_max{{stage="{_escape(k)}"}} {v["max"]:.6f}' for k, v in stages.items()]
+        lines += ["# HELP climate_chart_payload_bytes Serialized Vega-Lite size of the last emitted chart.",
+                  "# TYPE climate_chart_payload_bytes gauge"]
+        lines += [f'climate_chart_payload_bytes{{chart="{_escape(k)}"}} {v}' for k, v in charts.items()]
+        lines += ["# HELP climate_startup_seconds Wall time of each startup warm-up task.",
+                  "# TYPE climate_startup_seconds gauge"]
+        lines += [f'climate_startup_seconds{{task="{_escape(k)}",ok="{str(ok).lower()}"}} {v:.6f}'
+                  for k, (v, ok) in startup.items()]
+        lines += ["# HELP climate_ready Whether the startup warm-up has finished.",
+                  "# TYPE climate_ready gauge",
+                  f"climate_ready {int(self.is_ready())}"]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(label):
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ─── Metrics Endpoint ───────────────────────────────
+_server_lock = threading.Lock()
+_server = None
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            status, body = 200, REGISTRY.prometheus_text().encode()
+        elif path == "/ready":
+            status, body = (200, b"ready\n") if REGISTRY.is_ready() else (503, b"warming up\n")
+        else:
+            self.send_error(404)
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=None):
+    """Serve /metrics from a daemon thread, once per process. Returns the server, or None when no port is set."""
+    global _server
+    port = METRICS_PORT if port is None else port
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(("0.0.0.0", int(port)), _MetricsHandler)
+            except OSError as exc:
+                # Another worker on the host already owns the port
+                logger.warning("metrics endpoint not started on port %s: %s", port, exc)
+                return None
+            threading.Thread(target=_server.serve_forever, name="climate-metrics", daemon=True).start()
+        return _server
+
+
+# ─── Per-rerun Profiler ─────────────────────────────
+class Profiler:
+    """Collects the stages of one script run; a disabled profiler only forwards chart calls."""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.stages = []
+        self.finished = False
+        self._started = time.perf_counter()
+
+    @classmethod
+    def from_request(cls, query_params=None):
+        enabled = PROFILE_ENV
+        if not enabled and query_params is not None:
+            enabled = str(query_params.get("profile", "")).lower() in ("1", "true", "yes", "on")
+        if enabled:
+            start_metrics_server()
+        return cls(enabled)
+
+    @contextlib.contextmanager
+    def _measure(self, name, **extra):
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append({
+                "stage": name,
+                "wall_ms": (time.perf_counter() - start) * 1000,
+                "alloc_blocks": sys.getallocatedblocks() - blocks,
+                **extra,
+            })
+
+    def stage(self, name):
+        """Context manager timing one section of the script."""
+        return self._measure(name) if self.enabled else contextlib.nullcontext()
+
+    def altair_chart(self, name, chart, **kwargs):
+        """st.altair_chart, plus spec size and emission time when profiling."""
+        if not self.enabled:
+            return st.altair_chart(chart, **kwargs)
+        spec_start = time.perf_counter()
+        payload_bytes = len(json.dumps(chart.to_dict(), default=str))
+        spec_ms = (time.perf_counter() - spec_start) * 1000
+        with self._measure(f"chart: {name}", payload_bytes=payload_bytes, spec_ms=spec_ms):
+            return st.altair_chart(chart, **kwargs)
+
+    def finish(self, page=None):
+        """Log the run, add it to the process totals and return its stages."""
+        self.finished = True
+        if not self.enabled:
+            return []
+        total_ms = (time.perf_counter() - self._started) * 1000
+        self.stages.append({"stage": "total", "wall_ms": total_ms, "alloc_blocks": 0})
+        for s in self.stages:
+            logger.info(json.dumps({"event": "stage", "page": page, **s}))
+        REGISTRY.record(self.stages)
+        LAST_RUN[:] = self.stages
+        return self.stages
+
+    def render_panel(self, container):
+        """Per-stage table in a collapsed debug expander of `container` (e.g. st.sidebar)."""
+        if not self.enabled:
+            return
+        import pandas as pd
+
+        table = pd.DataFrame(self.stages).reindex(columns=["stage", "wall_ms", "alloc_blocks", "payload_bytes"])
+        panel = container.expander("🛠️ Profiling", expanded=False)
+        panel.dataframe(table.round({"wall_ms": 2}), hide_index=True)
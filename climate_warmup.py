@@ -0,0 +1,205 @@
+# 🔥 STARTUP WARM-UP
+# Imports the data stack and builds every dataset the dashboard uses in the
+# background, once per server process, so the first visitor after a deploy does
+# not pay for the whole cold path inside their request.
+#
+#   python climate_warmup.py      # deploy step: refresh every on-disk snapshot in parallel
+#
+# This module only uses the standard library at import time; pandas, numpy and
+# Altair are imported on first use through deferred() or by the warm-up thread.
+import argparse
+import importlib
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import climate_profiling
+
+logger = logging.getLogger("climate.warmup")
+
+
+class _WarmupThreadFilter(logging.Filter):
+    # Cached loaders look for a script run to attach their spinner to; the warm-up
+    # threads deliberately have none, so their "missing ScriptRunContext" warning is noise
+    def filter(self, record):
+        return not record.threadName.startswith("climate-warmup")
+
+
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(_WarmupThreadFilter())
+
+# Imported in this order on one thread before any dataset is built; concurrent first
+# imports of interdependent packages can deadlock on the import locks
+HEAVY_MODULES = ["numpy", "pandas", "pyarrow", "altair", "climate_data", "climate_analytics", "climate_charts",
+                 "climatebot"]
+
+
+# ─── Deferred Imports ───────────────────────────────
+class DeferredModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    If the warm-up thread is importing the module at that moment, the access
+    waits for that import instead of starting a second one.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = "imported" if self._module is not None else "deferred"
+        return f"<{state} module {self._name!r}>"
+
+
+def deferred(name):
+    """The module itself when it is already imported, otherwise a DeferredModule."""
+    return sys.modules.get(name) or DeferredModule(name)
+
+
+# ─── Warm-up ────────────────────────────────────────
+class WarmUp:
+    """Background import of HEAVY_MODULES followed by the dataset `tasks` on a thread pool.
+
+    `tasks` maps a dataset name to a callable that loads it, normally a
+    cached loader, so the result lands in the same cache a page reads.
+    """
+
+    def __init__(self, tasks, max_workers=None):
+        self.started = time.perf_counter()
+        self.timings = {}
+        self.errors = {}
+        self._tasks = dict(tasks)
+        self._done = {name: threading.Event() for name in ["imports", *self._tasks]}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or len(self._tasks) or 1,
+                                        thread_name_prefix="climate-warmup")
+        threading.Thread(target=self._run_all, name="climate-warmup", daemon=True).start()
+        # Serves /ready (and /metrics) when CLIMATE_METRICS_PORT is set
+        climate_profiling.start_metrics_server()
+        climate_profiling.REGISTRY.readiness = self.ready
+
+    def _run(self, name, fn):
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as exc:
+            # A failed warm-up is not fatal: the page retries the load (and shows the error) itself
+            self.errors[name] = repr(exc)
+            logger.exception("warm-up of %s failed", name)
+        finally:
+            self.timings[name] = time.perf_counter() - start
+            self._done[name].set()
+
+    def _import_all(self):
+        for module in HEAVY_MODULES:
+            importlib.import_module(module)
+
+    def _run_all(self):
+        self._run("imports", self._import_all)
+        futures = [self._pool.submit(self._run, name, fn) for name, fn in self._tasks.items()]
+        for future in futures:
+            future.result()
+        self.timings["total"] = time.perf_counter() - self.started
+        self._pool.shutdown(wait=False)
+        self._report()
+
+    def _report(self):
+        for name, seconds in self.timings.items():
+            logger.info(json.dumps({"event": "warmup", "task": name, "seconds": round(seconds, 4),
+                                    "ok": name not in self.errors}))
+        climate_profiling.REGISTRY.record_startup(self.timings, self.errors)
+
+    def ready(self, name=None):
+        """Whether `name` (default: everything) has finished loading, successfully or not."""
+        names = [name] if name is not None else list(self._done)
+        return all(self._done[n].is_set() for n in names)
+
+    def wait(self, name=None, timeout=None):
+        """Block until ready(name) or `timeout` seconds; returns ready(name)."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for n in [name] if name is not None else list(self._done):
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not self._done[n].wait(remaining):
+                return False
+        return True
+
+    def status(self):
+        """{name: (state, seconds)} with state "pending", "ready" or "failed"."""
+        status = {}
+        for name, done in self._done.items():
+            if not done.is_set():
+                status[name] = ("pending", time.perf_counter() - self.started)
+            else:
+                status[name] = ("failed" if name in self.errors else "ready", self.timings.get(name, 0.0))
+        return status
+
+
+_lock = threading.Lock()
+_warmup = None
+
+
+def start(tasks, max_workers=None):
+    """Start the process-wide warm-up on the first call; later calls return the running one."""
+    global _warmup
+    with _lock:
+        if _warmup is None:
+            _warmup = WarmUp(tasks, max_workers)
+        return _warmup
+
+
+def current():
+    """The process-wide warm-up, or None before the dashboard has started it."""
+    return _warmup
+
+
+# ─── Deploy-time Snapshots ──────────────────────────
+def _build_snapshot(name):
+    import climate_data
+
+    start = time.perf_counter()
+    if name == "indicator":
+        climate_data.load_indicator_long()
+    elif name == "gas":
+        climate_data.load_gas_wide()
+    elif name == "contributions":
+        climate_data.load_contributions()
+    elif name == "food":
+        climate_data.load_food_temp()
+    elif name == "monthly":
+        climate_data.load_monthly_cube()
+    else:
+        raise ValueError(f"unknown dataset: {name}")
+    return time.perf_counter() - start
+
+
+SNAPSHOTS = ["indicator", "gas", "contributions", "food", "monthly"]
+
+
+def build_snapshots(workers=None):
+    """Refresh every dataset snapshot in parallel processes; returns {name: seconds}."""
+    with ProcessPoolExecutor(max_workers=workers or len(SNAPSHOTS)) as pool:
+        return dict(zip(SNAPSHOTS, pool.map(_build_snapshot, SNAPSHOTS)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Refresh every dataset snapshot before the dashboard starts, so its warm-up only reads Parquet.")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per dataset)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    timings = build_snapshots(args.workers)
+    for name, seconds in timings.items():
+        print(f"{name:<14} {seconds * 1000:8.1f} ms")
+    print(f"Snapshots ready in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+# 🧠 CLIMATEBOT QUERY ENGINE
+# Answers Chat Assistant questions from indexes precomputed over the shared TrendCube.
+import re
+import unicodedata
+import warnings
+
+import numpy as np
+
+from climate_data import DEV_GROUPING
+
+YEAR_PATTERN = re.compile(r"\b(1[89]\d\d|20\d\d)\b")
+TOP_PATTERN = re.compile(r"\btop\s+(\d+)\b")
+SINCE_PATTERN = re.compile(r"\b(?:since|from)\s+(1[89]\d\d|20\d\d)\b")
+
+# Everyday names for countries whose official names differ, keyed by ISO3
+COUNTRY_ALIASES = {
+    "USA": ["usa", "u s a", "united states", "america"],
+    "GBR": ["uk", "u k", "britain", "great britain", "england"],
+    "RUS": ["russia"],
+    "CHN": ["china", "mainland china"],
+    "KOR": ["south korea", "korea"],
+    "PRK": ["north korea"],
+    "IRN": ["iran"],
+    "COD": ["dr congo", "drc", "democratic republic of the congo"],
+    "NLD": ["holland"],
+}
+
+HIGH_WORDS = ("highest", "hottest", "warmest", "largest", "biggest", "max", "maximum", "most")
+LOW_WORDS = ("lowest", "coldest", "coolest", "smallest", "min", "minimum", "least")
+FASTEST_WORDS = ("fastest", "quickest", "warming rate", "warmed the most", "warming the most")
+
+FALLBACK = "Great question! Try asking about a specific year, country, or trend type. I'm still learning! 🤖"
+
+
+def _normalize(text):
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def _fmt(value):
+    return "no data" if np.isnan(value) else f"{value:+.2f} °C"
+
+
+def _fmt_rate(slope):
+    return "no data" if np.isnan(slope) else f"{slope * 10:+.2f} °C/decade"
+
+
+def _rank_desc(values):
+    # Column-wise descending order with NaN last, plus the number of non-NaN entries per column
+    key = np.where(np.isnan(values), np.inf, -values)
+    return np.argsort(key, axis=0, kind="stable"), np.sum(~np.isnan(values), axis=0)
+
+
+class ClimateBot:
+    """Intent parser plus per-year rankings and per-country summaries, built once per TrendCube."""
+
+    def __init__(self, cube):
+        self.cube = cube
+        rows = np.flatnonzero(~cube.is_aggregate)
+        self._rows = rows
+        temp = cube.temp[rows]
+        yoy = cube.yoy[rows]
+
+        # Per-year rankings (row positions into `rows`), best first
+        self._temp_rank, self._temp_count = _rank_desc(temp)
+        self._yoy_rank, self._yoy_count = _rank_desc(yoy)
+
+        # Per-country summaries
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            first_decade = np.nanmean(cube.temp[:, :10], axis=1)
+            last_decade = np.nanmean(cube.temp[:, -10:], axis=1)
+        self._warming = last_decade - first_decade
+        self._last_decade = last_decade
+        self._rate_rank = self._rank_rates(cube.rates)
+
+        delta = (cube.std_late - cube.std_early)[rows]
+        self._variability_rank = rows[np.argsort(np.where(np.isnan(delta), np.inf, delta), kind="stable")]
+        self._variability_rank = self._variability_rank[:np.sum(~np.isnan(delta))]
+
+        self._aliases = self._build_aliases()
+        self._max_alias_len = max(len(a) for a in self._aliases)
+
+    # ─── Country Matching ───────────────────────────
+    def _build_aliases(self):
+        cube = self.cube
+        aliases = {}
+        short_names = {}
+        for i, name in enumerate(cube.countries):
+            aliases[tuple(_normalize(name).split())] = i
+            short = _normalize(name.split(",")[0])
+            short_names.setdefault(short, []).append(i)
+        # Names before the comma ("Iran, Islamic Rep. of" -> "iran") only when unambiguous
+        for short, idx in short_names.items():
+            if len(idx) == 1:
+                aliases.setdefault(tuple(short.split()), idx[0])
+        iso_index = {code: i for i, code in enumerate(cube.iso3)}
+        for code, names in COUNTRY_ALIASES.items():
+            if code in iso_index:
+                for alias in names:
+                    aliases[tuple(alias.split())] = iso_index[code]
+        return aliases
+
+    def match_countries(self, text):
+        """Country indices mentioned in `text`, in order, using longest alias matches first."""
+        tokens = _normalize(text).split()
+        found = []
+        i = 0
+        while i < len(tokens):
+            for size in range(min(self._max_alias_len, len(tokens) - i), 0, -1):
+                idx = self._aliases.get(tuple(tokens[i:i + size]))
+                if idx is not None:
+                    if idx not in found:
+                        found.append(idx)
+                    i += size
+                    break
+            else:
+                i += 1
+        return found
+
+    # ─── Lookups ────────────────────────────────────
+    def _rank_rates(self, rates):
+        slope = rates.slope[self._rows]
+        order = np.argsort(np.where(np.isnan(slope), np.inf, -slope), kind="stable")
+        return self._rows[order[:np.sum(~np.isnan(slope))]]
+
+    def _year_col(self, year):
+        years = self.cube.years
+        if year is None:
+            # Latest year with any observation
+            return int(np.flatnonzero(self._temp_count > 0)[-1])
+        col = int(np.searchsorted(years, year))
+        if col >= len(years) or years[col] != year:
+            return None
+        return col
+
+    def _ranked(self, rank, count, col, n, highest=True):
+        order = rank[:count[col], col]
+        if not highest:
+            order = order[::-1]
+        return self._rows[order[:n]]
+
+    # ─── Intents ────────────────────────────────────
+    def extreme(self, year=None, n=3, highest=True):
+        col = self._year_col(year)
+        if col is None:
+            return self._unknown_year(year)
+        top = self._ranked(self._temp_rank, self._temp_count, col, n, highest)
+        if len(top) == 0:
+            return f"There is no temperature data for {self.cube.years[col]}."
+        label = "highest" if highest else "lowest"
+        year_label = int(self.cube.years[col])
+        lines = [f"In **{year_label}**, the country with the {label} temperature change was "
+                 f"**{self.cube.countries[top[0]]}** ({_fmt(self.cube.temp[top[0], col])})."]
+        if len(top) > 1:
+            lines.append("")
+            lines += [f"{k}. {self.cube.countries[i]}: {_fmt(self.cube.temp[i, col])}" for k, i in enumerate(top, 1)]
+        return "\n".join(lines)
+
+    def fastest(self, year=None, n=5, period=None):
+        if year is not None and period is None:
+            col = self._year_col(year)
+            if col is None:
+                return self._unknown_year(year)
+            top = self._ranked(self._yoy_rank, self._yoy_count, col, n)
+            if len(top) == 0:
+                return f"There is no year-over-year data for {year}."
+            lines = [f"The fastest one-year warming in **{year}** was in **{self.cube.countries[top[0]]}** "
+                     f"({_fmt(self.cube.yoy[top[0], col])} vs {year - 1}).", ""]
+            lines += [f"{k}. {self.cube.countries[i]}: {_fmt(self.cube.yoy[i, col])}" for k, i in enumerate(top, 1)]
+            return "\n".join(lines)
+
+        if period is None:
+            rates, top = self.cube.rates, self._rate_rank[:n]
+        else:
+            # Range fits are one batched solve over the sliced matrix
+            rates = self.cube.warming_rates(*period)
+            top = self._rank_rates(rates)[:n]
+        if len(top) == 0:
+            return "There is not enough data to fit warming trends for that period."
+        first, last = (int(rates.years[0]), int(rates.years[-1]))
+        lines = [f"Based on the linear trend over {first}–{last}, **{self.cube.countries[top[0]]}** is warming fastest "
+                 f"({_fmt_rate(rates.slope[top[0]])}).", ""]
+        lines += [f"{k}. {self.cube.countries[i]}: {_fmt_rate(rates.slope[i])} "
+                  f"(95% CI {rates.ci_low[i] * 10:+.2f} to {rates.ci_high[i] * 10:+.2f})" for k, i in enumerate(top, 1)]
+        return "\n".join(lines)
+
+    def compare(self, countries, year=None):
+        cube = self.cube
+        if year is not None:
+            col = self._year_col(year)
+            if col is None:
+                return self._unknown_year(year)
+            values = [(cube.countries[i], cube.temp[i, col]) for i in countries]
+            values = sorted(values, key=lambda v: -np.nan_to_num(v[1], nan=-np.inf))
+            lines = [f"Temperature change in **{year}**:", ""]
+            lines += [f"- **{name}**: {_fmt(v)}" for name, v in values]
+            return "\n".join(lines)
+
+        years = cube.years
+        lines = [f"Average temperature change over {years[-10]}–{years[-1]}, and warming since {years[0]}–{years[9]}:", ""]
+        for i in sorted(countries, key=lambda i: -np.nan_to_num(self._last_decade[i], nan=-np.inf)):
+            lines.append(f"- **{cube.countries[i]}**: {_fmt(self._last_decade[i])} (warming {_fmt(self._warming[i])})")
+        return "\n".join(lines)
+
+    def summary(self, country, year=None):
+        cube = self.cube
+        name = cube.countries[country]
+        row = cube.temp[country]
+        if np.all(np.isnan(row)):
+            return f"There is no temperature data for **{name}**."
+        if year is not None:
+            col = self._year_col(year)
+            if col is None:
+                return self._unknown_year(year)
+            value = row[col]
+            if np.isnan(value):
+                return f"There is no data for **{name}** in {year}."
+            return f"In **{year}**, **{name}** had a temperature change of {_fmt(value)}."
+        last = int(np.flatnonzero(~np.isnan(row))[-1])
+        peak = int(np.nanargmax(row))
+        text = f"**{name}**: {_fmt(row[last])} in {cube.years[last]}, peaking at {_fmt(row[peak])} in {cube.years[peak]}."
+        if not np.isnan(self._warming[country]):
+            text += f" Its last decade averaged {_fmt(self._warming[country])} warmer than {cube.years[0]}–{cube.years[9]}."
+        return text
+
+    def variability(self, countries=(), n=5):
+        cube = self.cube
+        intro = (
+            "Variability refers to how much temperatures fluctuate year to year. "
+            "Less variability means more climate stability, which can affect ecosystems and planning."
+        )
+        split = f"{cube.years[0]}–1992 vs 1993–{cube.years[-1]}"
+        if countries:
+            lines = [intro, "", f"Standard deviation of temperature change ({split}):", ""]
+            for i in countries:
+                lines.append(f"- **{cube.countries[i]}**: {cube.std_early[i]:.2f} → {cube.std_late[i]:.2f} "
+                             f"(∆ {cube.std_late[i] - cube.std_early[i]:+.2f})")
+            return "\n".join(lines)
+        top = self._variability_rank[:n]
+        lines = [intro, "", f"Largest decreases in variability ({split}):", ""]
+        lines += [f"{k}. {cube.countries[i]}: ∆ {cube.std_late[i] - cube.std_early[i]:+.2f}" for k, i in enumerate(top, 1)]
+        return "\n".join(lines)
+
+    def development(self):
+        cube = self.cube
+        years = cube.years
+        groups, means = cube.grouped_yearly_mean(DEV_GROUPING)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            recent = np.nanmean(means[:, -10:], axis=1)
+            early = np.nanmean(means[:, :10], axis=1)
+        lines = [
+            "Developed countries often show earlier increases due to industrialization. "
+            "Developing countries are now experiencing steeper rises due to economic growth and emissions.",
+            "",
+            f"Average temperature change, {years[-10]}–{years[-1]} (warming since {years[0]}–{years[9]}):",
+            "",
+        ]
+        lines += [f"- **{g}**: {_fmt(recent[k])} (warming {_fmt(recent[k] - early[k])})" for k, g in enumerate(groups)]
+        return "\n".join(lines)
+
+    def _unknown_year(self, year):
+        years = self.cube.years
+        return f"I only have data for {years[0]}–{years[-1]}, so I can't answer for {year}."
+
+    # ─── Entry Point ────────────────────────────────
+    def answer(self, prompt):
+        q = _normalize(prompt)
+        padded = f" {q} "
+        countries = self.match_countries(prompt)
+        found_years = sorted(int(y) for y in YEAR_PATTERN.findall(q))
+        year = found_years[0] if found_years else None
+        period = (found_years[0], found_years[-1]) if len(found_years) >= 2 else None
+        since = SINCE_PATTERN.search(q)
+        if period is None and since:
+            # "since 1990" is the range up to the latest year, not the single year 1990
+            period = (int(since.group(1)), int(self.cube.years[-1]))
+        top_match = TOP_PATTERN.search(q)
+        n = min(int(top_match.group(1)), 20) if top_match else None
+
+        def has(words):
+            return any(f" {w} " in padded for w in words)
+
+        if "variab" in q or "stabil" in q:
+            return self.variability(countries, n or 5)
+        if "developed" in q and "developing" in q:
+            return self.development()
+        if has(FASTEST_WORDS):
+            return self.fastest(year, n or 5, period)
+        if has(HIGH_WORDS) and (year is not None or not countries):
+            return self.extreme(year, n or 3, highest=True)
+        if has(LOW_WORDS) and (year is not None or not countries):
+            return self.extreme(year, n or 3, highest=False)
+        if len(countries) >= 2:
+            return self.compare(countries, year)
+        if len(countries) == 1:
+            return self.summary(countries[0], year)
+        return FALLBACK